@@ -1,31 +1,96 @@
-from datetime import timedelta
-from flask import Flask, request, jsonify
-from models import db
-from routes.auth import auth_bp
-from routes.articles import articles_bp
-from routes.user import users_bp
+from flask import Flask
+from config import Config
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
 
-app = Flask(__name__)
-CORS(app, supports_credentials=True)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///flask_blog_app.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["JWT_SECRET_KEY"] = "1b8797c955940205fccea47d3cd47abf"
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=4, minutes=30)
-app.config["JWT_TOKEN_LOCATION"] = ["cookies"]
+# Builds a configured app. `config` is an object or a dict applied on top
+# of config.Config, so tests and tools can vary settings per process.
+#
+# Nothing here touches the database: the schema is created and migrated
+# explicitly with `flask --app app db upgrade` (see utils/schema.py).
+# Blueprints and extensions are imported here rather than at module level,
+# so importing this module stays cheap.
+def create_app(config=None):
+    from commands import register_commands
+    from utils.cache import init_cache
+    from utils.compression import init_compression
+    from utils.db import init_db
+    from utils.identity import init_identity
+    from utils.metrics import init_metrics
+    from utils.related import init_related
+    from utils.scheduler import init_scheduler
+    from utils.serializers import init_json
+    from utils.views import init_views
+    from routes.auth import auth_bp
+    from routes.articles import articles_bp
+    from routes.user import users_bp
+    from routes.tags import tags_bp
+    from routes.metrics import metrics_bp
+    from routes.async_views import init_async_views
 
-# Initialize JWT Manager
-jwt = JWTManager(app)
+    app = Flask(__name__)
+    CORS(app, supports_credentials=True)
+    # Database URL, pool sizing, SQLite pragmas etc. come from the environment,
+    # see config.py
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
 
-# Pass the app object to db object of flask-sqlalchemy
-db.init_app(app)
+    # orjson backed JSON with ISO 8601 datetimes
+    init_json(app)
 
-app.register_blueprint(auth_bp, url_prefix="/auth")
-app.register_blueprint(articles_bp, url_prefix="/articles")
-app.register_blueprint(users_bp, url_prefix="/users")
+    # Initialize JWT Manager
+    jwt = JWTManager(app)
 
-# Creates the database tables
-with app.app_context():
-    db.create_all()
\ No newline at end of file
+    # current_user for authenticated routes, cached per process for a few seconds
+    init_identity(app, jwt)
+
+    # Pass the app object to db object of flask-sqlalchemy
+    init_db(app)
+
+    # Query counts, DB/serialization time and latency per endpoint, exposed as
+    # Server-Timing headers and at /metrics
+    init_metrics(app)
+
+    # Response cache for the public article endpoints
+    init_cache(app)
+
+    # gzip/brotli for responses above COMPRESS_MIN_SIZE, streamed ones included
+    init_compression(app)
+
+    app.register_blueprint(auth_bp, url_prefix="/auth")
+    app.register_blueprint(articles_bp, url_prefix="/articles")
+    app.register_blueprint(users_bp, url_prefix="/users")
+    app.register_blueprint(tags_bp, url_prefix="/tags")
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")
+
+    # Async views on the asyncio engine for the hot read endpoints, off unless
+    # ASYNC_VIEWS (asgi.py turns it on)
+    init_async_views(app)
+
+    # flask CLI maintenance and schema commands
+    register_commands(app)
+
+    # Background publishing of scheduled articles, off unless SCHEDULER_ENABLED
+    init_scheduler(app)
+
+    # Write-behind view counters and the /articles/popular ranking
+    init_views(app)
+
+    # Precomputed related-articles lists, refreshed in the background as
+    # articles are written
+    init_related(app)
+
+    return app
+
+
+# `gunicorn app:app`, `flask --app app` and `from app import app` keep
+# working: the module level app is built on first access, not on import
+def __getattr__(name):
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
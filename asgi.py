@@ -0,0 +1,18 @@
+# ASGI entry point, an alternative to `gunicorn app:app`:
+#
+#   pip install uvicorn a2wsgi "aiosqlite<0.22"    # aiomysql instead for MySQL
+#   uvicorn asgi:app --workers 4
+#
+# The Flask app runs on a pool of ASGI_THREADS threads per worker, and
+# GET /articles, /articles/<id> and /auth/me are served by the async views
+# in routes/async_views.py, which share one event loop and the asyncio
+# engine's connection pool. ASYNC_VIEWS=0 keeps the sync views.
+import os
+
+from a2wsgi import WSGIMiddleware
+
+os.environ.setdefault("ASYNC_VIEWS", "1")
+
+from app import create_app  # noqa: E402
+
+app = WSGIMiddleware(create_app(), workers=int(os.environ.get("ASGI_THREADS") or 16))
@@ -0,0 +1,166 @@
+# Throughput and latency of the read endpoints served by async views
+# (asgi.py under uvicorn) against the gunicorn sync workers, at rising
+# client concurrency, on a dataset generated with `seed.py bulk` in a
+# temporary SQLite database.
+#
+# Every server gets the same number of worker processes. "gthread" runs
+# the sync views on gunicorn threads, to tell what the threads alone buy
+# from what the async engine adds. The response cache is off unless
+# --cache, so every request takes the database path. Run from the
+# repository root:
+#
+#   python benchmarks/async_concurrency.py
+#   python benchmarks/async_concurrency.py --workers 2 --concurrency 1,16,64 --seconds 10
+#
+# The load comes from Python threads in this process, which saturate long
+# before a multi-worker server does on a big machine; compare the servers
+# with each other rather than reading the numbers as capacity.
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Ahead of benchmarks/, whose routes.py would shadow the routes package
+sys.path.insert(0, ROOT)
+
+from benchmarks.routes import HTTPDriver, free_port, percentile, sample_dataset, start_gunicorn, start_server  # noqa: E402
+
+SERVERS = ("sync", "gthread", "asgi")
+
+
+def read_requests(sample, rng):
+    cursor = rng.choice(sample["cursors"])
+    article_id = rng.choice(sample["ids"])
+    return rng.choice((
+        ("/articles", False),
+        (f"/articles?cursor={cursor}", False),
+        (f"/articles/{article_id}", False),
+        ("/auth/me", True),
+    ))
+
+
+def start(server, env, workers, threads):
+    if server == "sync":
+        return start_gunicorn({**env, "ASYNC_VIEWS": "0"}, workers)
+    if server == "gthread":
+        return start_gunicorn({**env, "ASYNC_VIEWS": "0"}, workers, "-k", "gthread", "--threads", str(threads))
+    port = free_port()
+    return start_server(
+        [sys.executable, "-m", "uvicorn", "asgi:app", "--workers", str(workers), "--port", str(port),
+         "--log-level", "warning"],
+        port, {**env, "ASYNC_VIEWS": "1", "ASGI_THREADS": str(threads)},
+    )
+
+
+def run_load(driver, sample, concurrency, seconds):
+    lock = threading.Lock()
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    def client(n):
+        nonlocal errors
+        rng = random.Random(n)
+        own_latencies, own_errors = [], 0
+        while time.perf_counter() < deadline:
+            path, auth = read_requests(sample, rng)
+            started = time.perf_counter()
+            status, _ = driver.request("GET", path, None, auth)
+            own_latencies.append(time.perf_counter() - started)
+            own_errors += status >= 400
+        with lock:
+            latencies.extend(own_latencies)
+            errors += own_errors
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async views against gunicorn sync workers under load")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=16, help="gthread threads / ASGI_THREADS per worker")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma separated client counts")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Load duration per concurrency level")
+    parser.add_argument("--server", action="append", choices=SERVERS, help="Only run these servers")
+    parser.add_argument("--cache", action="store_true", help="Leave the response cache on")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    servers = args.server or list(SERVERS)
+    if "asgi" in servers and not all(importlib.util.find_spec(name) for name in ("uvicorn", "a2wsgi", "aiosqlite")):
+        print("Skipping asgi: install uvicorn, a2wsgi and aiosqlite to benchmark it")
+        servers.remove("asgi")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configuration is read from the environment when app.py is imported
+        env = os.environ.copy()
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env["LOGIN_RATE_LIMIT_PER_IP"] = "1000000/60"
+        env["SCHEDULER_ENABLED"] = "0"
+        env["ASYNC_VIEWS"] = "0"
+        if not args.cache:
+            env["CACHE_DEFAULT_TTL"] = "0"
+        os.environ.update(env)
+
+        from app import create_app
+        from seed import seed_bulk
+
+        app = create_app()
+        with app.app_context():
+            seed_bulk(args.users, args.articles, args.tags, args.seed)
+        sample = sample_dataset(app)
+
+        results = {}
+        for server in servers:
+            proc, port = start(server, env, args.workers, args.threads)
+            try:
+                driver = HTTPDriver(port, sample["email"])
+                run_load(driver, sample, 2, 1)  # warm up pools and caches
+                for concurrency in levels:
+                    results[f"{server} c={concurrency}"] = run_load(driver, sample, concurrency, args.seconds)
+                    print(".", end="", flush=True)
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    print()
+    print(f"{'server':<16} {'n':>7} {'err':>4} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:<16} {r['requests']:>7} {r['errors']:>4} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} "
+            f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"workers": args.workers, "threads": args.threads, "results": results}, f, indent=2)
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
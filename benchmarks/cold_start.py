@@ -0,0 +1,140 @@
+# Cold start of the app in fresh processes: how long until the app object
+# exists, until it answered its first request, and how long gunicorn takes
+# to boot its workers and how much memory each one holds, against a small
+# dataset generated with `seed.py bulk` in a temporary SQLite database.
+#
+# Everything goes through `from app import app` and `gunicorn app:app`, so
+# the same script measures older checkouts too. Run from the repository
+# root:
+#
+#   python benchmarks/cold_start.py
+#   python benchmarks/cold_start.py --runs 10 --workers 4 --json cold.json
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.routes import free_port, start_server  # noqa: E402
+
+# Runs in a fresh interpreter, prints one JSON line
+PROBE = """
+import json, resource, time
+started = time.perf_counter()
+from app import app
+built = time.perf_counter()
+response = app.test_client().get("/articles")
+answered = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "create_ms": (built - started) * 1000,
+    "first_request_ms": (answered - built) * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def get(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def probe_app(env):
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    if result["status"] != 200:
+        raise RuntimeError(f"GET /articles answered {result['status']}")
+    return result
+
+
+def probe_gunicorn(env, workers):
+    port = free_port()
+    started = time.perf_counter()
+    proc, port = start_server(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "app:app"], port, env,
+    )
+    try:
+        # Workers boot in parallel after the master binds the socket
+        while get(port, "/articles") != 200:
+            time.sleep(0.05)
+        first_response = time.perf_counter() - started
+        for _ in range(workers * 4):
+            get(port, "/articles")
+        worker_rss = [rss_mb(pid) for pid in worker_pids(proc.pid)]
+        return {
+            "first_response_ms": first_response * 1000,
+            "master_rss_mb": rss_mb(proc.pid),
+            "worker_rss_mb": statistics.mean(worker_rss),
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(runs):
+    return {key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0] if key != "status"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="App creation and gunicorn boot time and memory")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement, medians are reported")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = os.environ.copy()
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env["SCHEDULER_ENABLED"] = "0"
+        subprocess.run(
+            [sys.executable, "seed.py", "bulk", "--users", "20", "--articles", str(args.articles), "--tags", "50"],
+            cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+
+        app_runs = [probe_app(env) for _ in range(args.runs)]
+        gunicorn_runs = [probe_gunicorn(env, args.workers) for _ in range(args.runs)]
+
+    results = {"app": summarize(app_runs), f"gunicorn -w {args.workers}": summarize(gunicorn_runs)}
+    for name, values in results.items():
+        print(f"{name}:")
+        for key, value in values.items():
+            print(f"  {key:<20} {value:>10.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# Concurrent read/write throughput of the SQLite setup, before and after
+# the connection pragmas from config.py.
+#
+# Every process stands in for a gunicorn worker with its own engine on a
+# shared database file: writers insert articles, readers run the listing
+# query. Run from the repository root:
+#
+#   python benchmarks/db_concurrency.py --readers 6 --writers 2 --seconds 5
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from config import Config  # noqa: E402
+from models import Article, User, db  # noqa: E402
+from utils.db import set_sqlite_pragmas  # noqa: E402
+
+MODES = {
+    # What app.py used to do: default journal, default 5s sqlite3 timeout
+    "before": {},
+    "after": Config.SQLITE_PRAGMAS,
+}
+
+
+def make_engine(path, pragmas):
+    engine = create_engine(f"sqlite:///{path}")
+    if pragmas:
+        event.listen(engine, "connect", set_sqlite_pragmas(pragmas))
+    return engine
+
+
+def setup(path, pragmas):
+    engine = make_engine(path, pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@example.com", "password_hash": "x"}])
+        conn.execute(insert(Article), [article_row(i) for i in range(2000)])
+    engine.dispose()
+
+
+def article_row(i):
+    return {
+        "title": f"Article {i}",
+        "slug": f"article-{os.getpid()}-{i}-{time.perf_counter_ns()}",
+        "excerpt": "Excerpt",
+        "featured_image_url": "https://example.com/image.png",
+        "read_time_minutes": 5,
+        "status": "published",
+        "content": "word " * 1500,
+        "author_id": 1,
+        "published_at": None,
+    }
+
+
+def worker(role, path, pragmas, seconds, results):
+    engine = make_engine(path, pragmas)
+    listing = (
+        select(Article.id, Article.title, Article.slug)
+        .where(Article.status == "published")
+        .order_by(Article.published_at.desc(), Article.id.desc())
+        .limit(20)
+    )
+    ops = errors = 0
+    i = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            with engine.begin() as conn:
+                if role == "writer":
+                    conn.execute(insert(Article), [article_row(i)])
+                else:
+                    conn.execute(listing).all()
+            ops += 1
+        except OperationalError:
+            # "database is locked"
+            errors += 1
+        i += 1
+    engine.dispose()
+    results.put((role, ops, errors))
+
+
+def run(mode, readers, writers, seconds):
+    pragmas = MODES[mode]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        setup(path, pragmas)
+
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=worker, args=(role, path, pragmas, seconds, results))
+            for role in ["reader"] * readers + ["writer"] * writers
+        ]
+        for proc in procs:
+            proc.start()
+        totals = {"reader": [0, 0], "writer": [0, 0]}
+        for _ in procs:
+            role, ops, errors = results.get()
+            totals[role][0] += ops
+            totals[role][1] += errors
+        for proc in procs:
+            proc.join()
+
+    print(
+        f"{mode:<7} reads/s {totals['reader'][0] / seconds:>9.0f}   "
+        f"writes/s {totals['writer'][0] / seconds:>7.0f}   "
+        f"lock errors {totals['reader'][1] + totals['writer'][1]}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite concurrent read/write benchmark")
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--mode", choices=[*MODES, "both"], default="both")
+    args = parser.parse_args()
+
+    for mode in MODES if args.mode == "both" else [args.mode]:
+        run(mode, args.readers, args.writers, args.seconds)
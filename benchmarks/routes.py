@@ -0,0 +1,386 @@
+# Latency, throughput and queries per request for every route, against a
+# dataset generated with `seed.py bulk` in a temporary SQLite database.
+#
+# By default requests go through the Flask test client one at a time, which
+# measures the application itself. --gunicorn starts real workers and drives
+# them from --concurrency threads over HTTP. Query counts are read from the
+# Server-Timing header added by utils/metrics.py.
+#
+# Results are compared with benchmarks/baselines/routes-<mode>.json and the
+# run exits with status 1 when a route got slower than the tolerance allows,
+# runs more queries than before or returns errors. Run from the repository
+# root:
+#
+#   python benchmarks/routes.py
+#   python benchmarks/routes.py --gunicorn --workers 4 --concurrency 16
+#   python benchmarks/routes.py --update-baseline
+#
+# Latency baselines are only meaningful on the machine that recorded them;
+# query counts are exact and hold everywhere: an N+1, an extra validator or
+# tag query adds at least one query per request and fails the run. Exact
+# counts for the hot read paths are also checked by the much quicker
+# tests/test_query_counts.py (`python -m pytest tests`). Routes missing
+# from the baseline are listed and not checked, re-record it when adding
+# one.
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(ROOT, "benchmarks", "baselines")
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+PASSWORD = "password123"
+
+sys.path.insert(0, ROOT)
+
+
+class Route:
+    def __init__(self, name, method, make, auth=False, requests=None, streamed=False):
+        self.name = name
+        self.method = method
+        self.make = make  # i -> (path, json body or None)
+        self.auth = auth
+        self.requests = requests  # overrides --requests for expensive routes
+        self.streamed = streamed  # queries run after the headers are sent
+
+
+def build_routes(sample):
+    rng = random.Random(1)
+    unique = itertools.count()
+
+    def pick(values):
+        return rng.choice(values)
+
+    def new_article(i):
+        n = next(unique)
+        return "/articles", {
+            "title": f"Benchmark article {n}",
+            "slug": f"benchmark-article-{os.getpid()}-{n}",
+            "featuredImageUrl": "https://example.com/image.png",
+            "status": "published",
+            "content": "<p>" + " ".join(rng.choices(sample["words"], k=600)) + "</p>",
+            "tags": rng.sample(sample["tags"], 3),
+        }
+
+    return [
+        Route("GET /articles", "GET", lambda i: ("/articles", None)),
+        Route("GET /articles?cursor", "GET", lambda i: (f"/articles?cursor={pick(sample['cursors'])}", None)),
+        Route("GET /articles?tag", "GET", lambda i: (f"/articles?tag={pick(sample['tags'])}", None)),
+        Route("GET /articles?tag&match=any", "GET", lambda i: (
+            f"/articles?tag={','.join(rng.sample(sample['tags'], 3))}&match=any", None
+        )),
+        Route("GET /articles/search", "GET", lambda i: (
+            f"/articles/search?q={pick(sample['words'])}+{pick(sample['words'])}", None
+        )),
+        Route("GET /articles/<id>", "GET", lambda i: (f"/articles/{pick(sample['ids'])}", None)),
+        Route("GET /articles/<id>/related", "GET", lambda i: (f"/articles/{pick(sample['ids'])}/related", None)),
+        Route("GET /articles/by-slug/<slug>", "GET", lambda i: (f"/articles/by-slug/{pick(sample['slugs'])}", None)),
+        Route("GET /articles/export", "GET", lambda i: ("/articles/export", None), requests=3, streamed=True),
+        Route("GET /tags", "GET", lambda i: ("/tags", None)),
+        Route("GET /users/<id>", "GET", lambda i: (f"/users/{pick(sample['author_ids'])}", None)),
+        Route("GET /users/<id>/articles", "GET", lambda i: (f"/users/{pick(sample['author_ids'])}/articles", None)),
+        Route("GET /users/articles", "GET", lambda i: ("/users/articles", None), auth=True),
+        Route("GET /auth/me", "GET", lambda i: ("/auth/me", None), auth=True),
+        Route("POST /articles", "POST", new_article, auth=True),
+        Route("PUT /articles/<id>", "PUT", lambda i: (
+            f"/articles/{pick(sample['own_ids'])}", {"excerpt": f"Edited excerpt {next(unique)}"}
+        ), auth=True),
+        Route("POST /auth/login", "POST", lambda i: (
+            "/auth/login", {"email": sample["email"], "password": PASSWORD}
+        ), requests=10),
+        Route("POST /auth/register", "POST", lambda i: (
+            "/auth/register", {"email": f"bench{os.getpid()}-{next(unique)}@example.com", "password": PASSWORD}
+        ), requests=10),
+    ]
+
+
+# Ids, slugs, cursors and tags to draw request parameters from
+def sample_dataset(app):
+    from models import Article, Tag
+    from seed import TOPICS
+    from utils.pagination import encode_cursor
+
+    with app.app_context():
+        published = Article.query.filter_by(status="published").order_by(Article.id).all()
+        rng = random.Random(0)
+        chosen = rng.sample(published, min(500, len(published)))
+        own = Article.query.filter_by(author_id=1).with_entities(Article.id).all()
+        return {
+            "ids": [article.id for article in chosen],
+            "slugs": [article.slug for article in chosen],
+            "cursors": [encode_cursor(article) for article in chosen],
+            "tags": [tag.slug for tag in Tag.query.order_by(Tag.article_count.desc()).limit(50)],
+            "own_ids": [article_id for (article_id,) in own],
+            "author_ids": sorted({article.author_id for article in chosen}),
+            "words": TOPICS,
+            "email": "user1@example.com",
+        }
+
+
+class TestClientDriver:
+    def __init__(self, app, email):
+        self.client = app.test_client()
+        self.client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        self.csrf = self.client.get_cookie("csrf_access_token").value
+
+    def request(self, method, path, body, auth):
+        headers = {"X-CSRF-TOKEN": self.csrf} if auth else {}
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        response.get_data()
+        return response.status_code, response.headers.get("Server-Timing", "")
+
+
+class HTTPDriver:
+    def __init__(self, port, email):
+        self.port = port
+        status, headers, _ = self._send("POST", "/auth/login", {"email": email, "password": PASSWORD}, {})
+        cookies = SimpleCookie()
+        for name, value in headers:
+            if name.lower() == "set-cookie":
+                cookies.load(value)
+        self.cookie = "; ".join(f"{key}={morsel.value}" for key, morsel in cookies.items())
+        self.csrf = cookies["csrf_access_token"].value
+
+    def _send(self, method, path, body, headers):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        try:
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers = {**headers, "Content-Type": "application/json"}
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status, response.getheaders(), response.getheader("Server-Timing", "")
+        finally:
+            conn.close()
+
+    def request(self, method, path, body, auth):
+        headers = {"Cookie": self.cookie, "X-CSRF-TOKEN": self.csrf} if auth else {}
+        status, _, server_timing = self._send(method, path, body, headers)
+        return status, server_timing
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Starts `command` from the repository root and waits until it accepts
+# connections on `port`
+def start_server(command, port, env):
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{command[2]} did not start")
+
+
+def start_gunicorn(env, workers, *options):
+    port = free_port()
+    return start_server(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), *options, "-b", f"127.0.0.1:{port}", "app:app"],
+        port, env,
+    )
+
+
+def percentile(sorted_values, pct):
+    index = max(0, int(round(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def run_route(driver, route, requests, concurrency, warmup=3):
+    count = route.requests or requests
+    for i in range(min(warmup, count)):
+        path, body = route.make(i)
+        driver.request(route.method, path, body, route.auth)
+
+    lock = threading.Lock()
+    latencies, queries, errors = [], [], 0
+
+    def one(i):
+        nonlocal errors
+        path, body = route.make(i)
+        start = time.perf_counter()
+        status, server_timing = driver.request(route.method, path, body, route.auth)
+        elapsed = time.perf_counter() - start
+        match = SERVER_TIMING_QUERIES.search(server_timing)
+        with lock:
+            latencies.append(elapsed)
+            if match:
+                queries.append(int(match.group(1)))
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(one, range(count)))
+    else:
+        for i in range(count):
+            one(i)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "rps": round(count / wall, 1),
+        "queries": None if route.streamed or not queries else round(sum(queries) / len(queries), 2),
+    }
+
+
+# Slower than p95 * (1 + tolerance) and by at least `floor_ms`, so that
+# sub-millisecond routes do not fail on scheduler noise
+def compare(results, baseline, tolerance, floor_ms):
+    failures = []
+    for name, result in results.items():
+        if result["errors"]:
+            failures.append(f"{name}: {result['errors']} error responses")
+        before = baseline["routes"].get(name)
+        if before is None:
+            continue
+        limit = max(before["p95_ms"] * (1 + tolerance), before["p95_ms"] + floor_ms)
+        if result["p95_ms"] > limit:
+            failures.append(f"{name}: p95 {result['p95_ms']:.2f} ms, baseline {before['p95_ms']:.2f} ms")
+        # Averages, so concurrent runs where a worker's slug cache was still
+        # cold do not count; an N+1 adds at least one query per request
+        if before["queries"] is not None and result["queries"] is not None and result["queries"] > before["queries"] + 0.5:
+            failures.append(f"{name}: {result['queries']} queries per request, baseline {before['queries']}")
+    return failures
+
+
+def print_table(results):
+    print(f"{'route':<32} {'n':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'queries':>8}")
+    for name, r in results.items():
+        queries = "-" if r["queries"] is None else f"{r['queries']:g}"
+        print(
+            f"{name:<32} {r['requests']:>5} {r['errors']:>4} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+            f"{r['p99_ms']:>9.2f} {r['rps']:>9.1f} {queries:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-route latency and query benchmark")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--cache", action="store_true", help="Leave the response cache on")
+    parser.add_argument("--gunicorn", action="store_true", help="Benchmark real gunicorn workers over HTTP")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--route", action="append", help="Only run routes containing this text")
+    parser.add_argument("--baseline", help="Baseline file, default benchmarks/baselines/routes-<mode>.json")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="Allowed p95 slowdown, 1.0 = twice as slow")
+    parser.add_argument("--floor-ms", type=float, default=5.0, help="Ignore p95 slowdowns smaller than this")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    mode = "gunicorn" if args.gunicorn else "client"
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"routes-{mode}.json")
+    dataset = {"users": args.users, "articles": args.articles, "tags": args.tags, "seed": args.seed}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configuration is read from the environment when app.py is imported
+        env = os.environ.copy()
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env["LOGIN_RATE_LIMIT_PER_IP"] = "1000000/60"
+        env["SCHEDULER_ENABLED"] = "0"
+        env["METRICS_ENABLED"] = "1"
+        env["SERVER_TIMING"] = "1"
+        if not args.cache:
+            # Entries expire as soon as they are stored, every request
+            # takes the database path
+            env["CACHE_DEFAULT_TTL"] = "0"
+        os.environ.update(env)
+
+        from app import create_app
+        from seed import seed_bulk
+
+        app = create_app()
+        with app.app_context():
+            seed_bulk(args.users, args.articles, args.tags, args.seed)
+        sample = sample_dataset(app)
+
+        proc = None
+        if args.gunicorn:
+            proc, port = start_gunicorn(env, args.workers)
+            driver = HTTPDriver(port, sample["email"])
+            concurrency = args.concurrency
+        else:
+            driver = TestClientDriver(app, sample["email"])
+            concurrency = 1
+
+        try:
+            results = {}
+            for route in build_routes(sample):
+                if args.route and not any(text in route.name for text in args.route):
+                    continue
+                results[route.name] = run_route(driver, route, args.requests, concurrency)
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+
+    print()
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"mode": mode, "dataset": dataset, "routes": results}, f, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump({"mode": mode, "dataset": dataset, "routes": results}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"\nNo baseline at {baseline_path}, run with --update-baseline to record one")
+        return 0
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline["dataset"] != dataset:
+        print(f"\nBaseline was recorded with {baseline['dataset']}, this run used {dataset}")
+        return 2
+
+    unchecked = [name for name in results if name not in baseline["routes"]]
+    if unchecked:
+        print("\nNot in the baseline, not checked:", ", ".join(unchecked))
+    failures = compare(results, baseline, args.tolerance, args.floor_ms)
+    if failures:
+        print("\nRegressions against", baseline_path)
+        for failure in failures:
+            print("  " + failure)
+        return 1
+    print("\nNo regressions against", baseline_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
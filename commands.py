@@ -0,0 +1,220 @@
+import time
+
+import click
+from sqlalchemy import func, select, update
+
+from models import Article, ArticleTag, Tag, db, utcnow
+from utils.cache import get_cache, invalidate_articles
+from utils.content import content_hash, make_excerpt, plain_text, read_time
+from utils.related import rebuild_related
+from utils.scheduler import publish_due_articles
+from utils.schema import MIGRATIONS, applied_versions, upgrade
+from utils.tags import PUBLISHED, linked_tag_ids, recount_tags
+from utils.views import prune_view_counts
+
+
+# flask --app app backfill-content [--batch-size 500] [--sleep 0.1] [--force]
+#
+# Fills word_count, read_time_minutes and content_hash (and empty
+# excerpts) for rows written before they were derived on the server.
+# Walks the table by primary key in small batches and commits after each
+# one, so no long write transaction ever holds the database.
+@click.command("backfill-content")
+@click.option("--batch-size", default=500, show_default=True, help="Rows read and updated per transaction")
+@click.option("--sleep", default=0.0, show_default=True, help="Seconds to pause between batches")
+@click.option("--force", is_flag=True, help="Recompute rows whose content hash is already current")
+def backfill_content(batch_size, sleep, force):
+    last_id = 0
+    scanned = updated = 0
+    while True:
+        rows = (
+            db.session.query(Article.id, Article.content, Article.content_hash, Article.excerpt)
+            .filter(Article.id > last_id)
+            .order_by(Article.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        changes = []
+        for row in rows:
+            digest = content_hash(row.content)
+            if digest == row.content_hash and not force:
+                continue
+            text = plain_text(row.content)
+            word_count = len(text.split())
+            change = {
+                "id": row.id,
+                "word_count": word_count,
+                "read_time_minutes": read_time(word_count),
+                "content_hash": digest,
+                "updated_at": utcnow(),
+            }
+            if not row.excerpt:
+                change["excerpt"] = make_excerpt(text)
+            changes.append(change)
+
+        if changes:
+            # ORM bulk UPDATE by primary key, one executemany per batch
+            db.session.execute(update(Article), changes)
+        db.session.commit()
+
+        scanned += len(rows)
+        updated += len(changes)
+        last_id = rows[-1].id
+        click.echo(f"Scanned {scanned} articles, updated {updated}")
+        if sleep:
+            time.sleep(sleep)
+
+    click.echo(f"✅ Backfill done, {updated} of {scanned} articles updated")
+
+
+# flask --app app publish-scheduled [--loop] [--interval 30]
+#
+# Publishes scheduled articles that are due. With --loop it keeps running
+# as a small worker process next to gunicorn; any number of them can run
+# at once without publishing an article twice.
+@click.command("publish-scheduled")
+@click.option("--loop", is_flag=True, help="Keep polling instead of running once")
+@click.option("--interval", default=30.0, show_default=True, help="Seconds between polls with --loop")
+@click.option("--batch-size", default=100, show_default=True, help="Articles claimed per transaction")
+def publish_scheduled(loop, interval, batch_size):
+    if get_cache().name == "memory":
+        click.echo(
+            "Warning: with CACHE_BACKEND=memory web workers only see published articles once their cached "
+            "responses expire, use CACHE_BACKEND=shared to invalidate them right away",
+            err=True,
+        )
+    while True:
+        published = publish_due_articles(batch_size)
+        if published:
+            click.echo(f"Published {len(published)} articles: {published}")
+        if not loop:
+            break
+        time.sleep(interval)
+
+
+# flask --app app check-tags [--repair] [--batch-size 1000]
+#
+# Compares the denormalized Article.tag_ids with the article_tag rows and
+# Tag.article_count with a fresh count of published links. Reports drift
+# and exits with status 1 so it can run from cron; --repair rewrites the
+# drifted rows from article_tag, which stays the source of truth. Also
+# fills tag_ids for articles written before the column existed.
+@click.command("check-tags")
+@click.option("--repair", is_flag=True, help="Rewrite drifted rows instead of only reporting them")
+@click.option("--batch-size", default=1000, show_default=True, help="Articles checked per transaction")
+def check_tags(repair, batch_size):
+    last_id = 0
+    scanned = 0
+    drifted = []
+    while True:
+        rows = (
+            db.session.query(Article.id, Article.tag_ids)
+            .filter(Article.id > last_id)
+            .order_by(Article.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        links = linked_tag_ids([row.id for row in rows])
+        # Order is presentation only, drift is a different set of tags
+        changes = [
+            {"id": row.id, "tag_ids": links[row.id], "updated_at": utcnow()}
+            for row in rows
+            if row.tag_ids is None or sorted(row.tag_ids) != sorted(links[row.id])
+        ]
+        if changes and repair:
+            db.session.execute(update(Article), changes)
+        db.session.commit()
+
+        scanned += len(rows)
+        drifted.extend(change["id"] for change in changes)
+        last_id = rows[-1].id
+
+    published_links = dict(
+        db.session.query(ArticleTag.tag_id, func.count(ArticleTag.id))
+        .join(Article, ArticleTag.article_id == Article.id)
+        .filter(Article.status == PUBLISHED)
+        .group_by(ArticleTag.tag_id)
+        .all()
+    )
+    wrong_counts = [
+        slug for tag_id, slug, count in db.session.execute(select(Tag.id, Tag.slug, Tag.article_count))
+        if count != published_links.get(tag_id, 0)
+    ]
+    if wrong_counts and repair:
+        recount_tags()
+        db.session.commit()
+
+    click.echo(f"Checked {scanned} articles: {len(drifted)} with drifted tag_ids")
+    click.echo(f"Checked tag counts: {len(wrong_counts)} wrong")
+    if not drifted and not wrong_counts:
+        click.echo("✅ Tags are consistent")
+        return
+    if not repair:
+        raise SystemExit(1)
+
+    invalidate_articles(article_ids=drifted, tag_slugs=wrong_counts)
+    click.echo("✅ Repaired")
+
+
+# flask --app app rebuild-related [--batch-size 500]
+#
+# Recomputes every related-articles list. Writes keep the lists current
+# incrementally; run this after `db upgrade` adds the table, after a bulk
+# load, or from cron to catch lists an article dropped out of.
+@click.command("rebuild-related")
+@click.option("--batch-size", default=500, show_default=True, help="Articles rebuilt per transaction")
+def rebuild_related_command(batch_size):
+    started = time.perf_counter()
+    total = rebuild_related(batch_size)
+    click.echo(f"✅ Rebuilt related articles of {total} articles in {time.perf_counter() - started:.1f}s")
+
+
+# flask --app app prune-views
+#
+# Deletes hourly view buckets older than the longest /articles/popular
+# window. Run it from cron, e.g. daily; nothing in the web workers prunes.
+@click.command("prune-views")
+def prune_views():
+    deleted = prune_view_counts()
+    click.echo(f"✅ Pruned {deleted} view count buckets")
+
+
+# flask --app app db upgrade | status
+#
+# The app no longer creates tables when it starts. Run `db upgrade` once
+# per deploy, before starting the workers; it creates the schema of an
+# empty database and applies pending migrations to an existing one.
+@click.group("db", help="Create and migrate the database schema.")
+def schema():
+    pass
+
+
+@schema.command("upgrade")
+def schema_upgrade():
+    applied = upgrade()
+    if applied:
+        click.echo(f"✅ Applied migrations {', '.join(map(str, applied))}")
+    else:
+        click.echo("Schema is up to date")
+
+
+@schema.command("status")
+def schema_status():
+    applied = applied_versions()
+    for version, name, _ in MIGRATIONS:
+        click.echo(f"{'applied' if version in applied else 'pending':<8} {version:>4}  {name}")
+
+
+def register_commands(app):
+    app.cli.add_command(schema)
+    app.cli.add_command(backfill_content)
+    app.cli.add_command(publish_scheduled)
+    app.cli.add_command(check_tags)
+    app.cli.add_command(rebuild_related_command)
+    app.cli.add_command(prune_views)
@@ -1,11 +1,18 @@
 
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, func, Text, Integer, DateTime, ForeignKey, UniqueConstraint
-from datetime import datetime
+from sqlalchemy import JSON, String, func, Text, Integer, Float, DateTime, ForeignKey, UniqueConstraint, Index
+from datetime import datetime, timezone
 
 db = SQLAlchemy()
 
+
+# Naive UTC with microseconds, matching what func.now() stores but fine
+# grained enough that two edits within the same second still differ
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -17,7 +24,8 @@ class User(db.Model):
     # This column to have roles in our app such as user,admin,manager, etc
     role: Mapped[str]  = mapped_column(String(255), nullable=False, default="user")
     created_at: Mapped[datetime]  = mapped_column(server_default=func.now())
-    updated_at: Mapped[datetime]  = mapped_column(server_default=func.now(), onupdate=func.now())
+    # Indexed so MAX(updated_at) for article validators is a single seek
+    updated_at: Mapped[datetime]  = mapped_column(server_default=func.now(), onupdate=func.now(), index=True)
 
     # Relationship
     articles = relationship("Article", back_populates="author")
@@ -34,7 +42,28 @@ class Article(db.Model):
     status: Mapped[str] = mapped_column(String(50), nullable=False)
     published_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Derived from `content` on write, see utils/content.py
+    word_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+    # Denormalized copy of this article's article_tag links, read instead of
+    # joining through article_tag. Kept in sync by utils/tags.py, checked and
+    # repaired by `flask check-tags`.
+    tag_ids: Mapped[list] = mapped_column(JSON, nullable=True, default=list)
     author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), default=utcnow, onupdate=utcnow)
+
+    __table_args__ = (
+        # Composite indexes backing the keyset pagination on (published_at, id)
+        Index("ix_articles_status_published_at_id", "status", "published_at", "id"),
+        Index("ix_articles_author_id_published_at_id", "author_id", "published_at", "id"),
+        # Public author pages: published articles of one author, and their
+        # COUNT / MAX(published_at) from the index alone
+        Index("ix_articles_author_id_status_published_at_id", "author_id", "status", "published_at", "id"),
+        # COUNT(*) per status and MAX(updated_at) of all articles for the
+        # listing validators
+        Index("ix_articles_status_updated_at", "status", "updated_at"),
+        Index("ix_articles_updated_at", "updated_at"),
+    )
     
     # Relationship
     author = relationship("User", back_populates="articles")
@@ -46,6 +75,8 @@ class Tag(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     slug: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    # Number of published articles with this tag, maintained on article writes
+    article_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
@@ -61,9 +92,44 @@ class ArticleTag(db.Model):
     updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
     __table_args__ = (
+        # Also serves tag -> articles lookups for tag filtering
         UniqueConstraint("tag_id", "article_id", name="uq_article_tag"),
+        # article -> tags lookups
+        Index("ix_article_tag_article_id_tag_id", "article_id", "tag_id"),
     )
 
     # Relationships
     article = relationship("Article", back_populates="article_tags")
     tag = relationship("Tag", back_populates="article_tags")
+
+
+# Article views per hour. Written in batches by utils/views.py, never on
+# the request path, and read by the background popularity ranking.
+class ArticleViewCount(db.Model):
+    __tablename__ = "article_view_counts"
+
+    article_id: Mapped[int] = mapped_column(Integer, ForeignKey("articles.id"), primary_key=True)
+    # Start of the hour, naive UTC
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    views: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Window scans for the ranking and pruning of old buckets
+        Index("ix_article_view_counts_bucket", "bucket"),
+    )
+
+
+# Precomputed "related posts": the top RELATED_SIZE published articles
+# sharing tags with each article, written by utils/related.py and read by
+# /articles/<id>/related with one range scan on the primary key index.
+class RelatedArticle(db.Model):
+    __tablename__ = "related_articles"
+
+    article_id: Mapped[int] = mapped_column(Integer, ForeignKey("articles.id"), primary_key=True)
+    related_id: Mapped[int] = mapped_column(Integer, ForeignKey("articles.id"), primary_key=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        # Lists an article appears in, for incremental updates
+        Index("ix_related_articles_related_id", "related_id"),
+    )
@@ -1,55 +1,304 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
+import io
 
-from models import ArticleTag, Tag, db, Article
-from slugify import slugify
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import current_user, get_current_user, jwt_required
+
+from models import db, Article, RelatedArticle, utcnow
+from utils.bulk import import_articles
+from utils.cache import (
+    article_cache_tag, author_cache_tag, cache_key, cache_response, cached_response, cached_response_with,
+    get_cache, get_slug_cache, invalidate_articles, listing_cache_tag, related_cache_tag, tag_cache_tag,
+)
+from utils.conditional import not_modified_response, set_validators
+from utils.content import is_generated_excerpt, make_excerpt, plain_text, refresh_content_metadata
+from utils.metrics import timed_serialization
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_page_args, paginate_articles
+from utils.queries import (
+    article_detail_options, article_summary_options, article_validators, listing_validators,
+)
+from utils.related import mark_related, related_enabled
+from utils.scheduler import SCHEDULED, apply_publish_at, parse_publish_at
+from utils.search import index_article, search_articles, search_enabled
+from utils.serializers import (
+    serialize_article_detail, serialize_article_summary, serialize_own_article,
+)
+from utils.streaming import stream_json_array, stream_ndjson
+from utils.tags import (
+    PUBLISHED, filter_by_tags, link_new_articles, prime_tag_cache, resolve_tags, set_article_tags, tags_for,
+    update_article_tag_counts,
+)
+from utils.views import POPULAR_SIZE, POPULAR_WINDOWS, get_popular_ranking, record_view
 
 
 articles_bp = Blueprint("articles", __name__)
 
+MAX_TAG_FILTERS = 10
+# Read buffer for streamed request bodies
+STREAM_READ_SIZE = 64 * 1024
+
+# Query args of GET /articles as (status, limit, cursor, tag slugs,
+# match all), raises ValueError on bad input. Shared with the async view.
+def listing_args():
+    status = request.args.get("status", "published", type=str)
+    limit, cursor = get_page_args()
+
+    # ?tag=python&tag=react or ?tag=python,react, ?match=all (default) or any
+    tag_slugs = []
+    for value in request.args.getlist("tag"):
+        tag_slugs.extend(slug for slug in value.split(",") if slug and slug not in tag_slugs)
+    match = request.args.get("match", "all", type=str)
+    if match not in ("all", "any"):
+        raise ValueError("match must be either 'all' or 'any'")
+    if len(tag_slugs) > MAX_TAG_FILTERS:
+        raise ValueError(f"At most {MAX_TAG_FILTERS} tags can be combined")
+    return status, limit, cursor, tag_slugs, match == "all"
+
+
+def listing_cache_tags(status, tag_slugs, page):
+    tags = {listing_cache_tag(status)}
+    tags.update(tag_cache_tag(slug) for slug in tag_slugs)
+    for article in page:
+        tags.add(article_cache_tag(article.id))
+        tags.add(author_cache_tag(article.author_id))
+        tags.update(tag_cache_tag(tag["slug"]) for tag in tags_for(article.tag_ids))
+    return tags
+
+
 # /articles [GET] - Public endpoint to fetch all articles
 @articles_bp.route("", methods=["GET"])
 def get_articles():
-    status = request.args.get("status", "published", type=str)
+    try:
+        status, limit, cursor, tag_slugs, match_all = listing_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    key = cache_key("articles.list", request.args)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached.make_conditional(request)
+
+    etag, last_modified = listing_validators(status, key)
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
     
-    query = Article.query
+    query = Article.query.options(*article_summary_options())
     
     # Filter by status if specified
     if status:
         query = query.filter_by(status=status)
+
+    if tag_slugs:
+        query = filter_by_tags(query, tag_slugs, match_all=match_all)
     
-    # Get all results ordered by published date
-    all_articles = query.order_by(Article.published_at.desc()).all()
+    # Get one page of results ordered by published date
+    page, next_cursor = paginate_articles(query, limit, cursor)
+    prime_tag_cache(tag_id for article in page for tag_id in article.tag_ids or ())
     
-    articles = []
-    for article in all_articles:
-        article_tags = []
-        for article_tag in article.article_tags:
-            article_tags.append({
-                "id": article_tag.tag.id,
-                "title": article_tag.tag.title,
-                "slug": article_tag.tag.slug,
-            })
-        
-        articles.append({
-            "id": article.id,
-            "title": article.title,
-            "slug": article.slug,
-            "excerpt": article.excerpt,
-            "featured_image_url": article.featured_image_url,
-            "read_time_minutes": article.read_time_minutes,
-            "status": article.status,
-            "author": {
-                "id": article.author.id,
-                "name": article.author.name,
-                "email": article.author.email,
-                "avatar": article.author.avatar,
-            },
-            "published_at": article.published_at,
-            "tags": article_tags
-        })
+    with timed_serialization():
+        articles = [serialize_article_summary(article) for article in page]
     
-    return jsonify(articles)
+    response = jsonify({
+        "articles": articles,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
+    set_validators(response, etag, last_modified)
+    return cache_response(key, response, listing_cache_tags(status, tag_slugs, page))
+
+
+# /articles/search?q= [GET] - Public full-text search over published articles
+@articles_bp.route("/search", methods=["GET"])
+def search_articles_route():
+    if not search_enabled():
+        return jsonify({"error": "Search is only available on SQLite"}), 501
+
+    q = request.args.get("q", "", type=str).strip()
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    page = request.args.get("page", 1, type=int)
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    if limit is None or limit < 1 or page is None or page < 1:
+        return jsonify({"error": "limit and page must be positive integers"}), 400
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    key = cache_key("articles.search", request.args)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+
+    # Ranked ids and snippets come from the FTS index, one extra row tells
+    # whether there is a next page
+    hits = search_articles(q, PUBLISHED, limit + 1, (page - 1) * limit)
+    has_next = len(hits) > limit
+    hits = hits[:limit]
+
+    found = Article.query.options(*article_summary_options()).filter(
+        Article.id.in_([hit.id for hit in hits])
+    ).all()
+    found = {article.id: article for article in found}
+    prime_tag_cache(tag_id for article in found.values() for tag_id in article.tag_ids or ())
+
+    results = []
+    for hit in hits:
+        result = serialize_article_summary(found[hit.id])
+        result["score"] = -hit.score
+        result["snippet"] = hit.snippet
+        results.append(result)
+
+    response = jsonify({
+        "results": results,
+        "page": page,
+        "limit": limit,
+        "next_page": page + 1 if has_next else None,
+    })
+
+    # Any newly published or edited article may change the ranking
+    tags = {listing_cache_tag(PUBLISHED)}
+    tags.update(article_cache_tag(article_id) for article_id in found)
+    return cache_response(key, response, tags)
+
+
+# /articles/popular?window=24h|7d|30d [GET] - Most viewed published articles
+# with time-decayed scores. The ranking is precomputed in the background,
+# this only loads the cards for the top ids.
+@articles_bp.route("/popular", methods=["GET"])
+def popular_articles():
+    window = request.args.get("window", "24h", type=str)
+    if window not in POPULAR_WINDOWS:
+        return jsonify({"error": f"window must be one of {', '.join(POPULAR_WINDOWS)}"}), 400
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit, POPULAR_SIZE)
+    if "popular_ranking" not in current_app.extensions:
+        return jsonify({"error": "View counts are disabled"}), 501
+
+    ranking = get_popular_ranking()
+    if not ranking.refreshed.is_set():
+        # First request before the background thread got to it
+        ranking.refresh()
+
+    # A new ranking generation gets new entries, the old ones age out
+    key = cache_key("articles.popular", request.args, generation=ranking.generation)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+
+    top = ranking.top(window, limit)
+    found = Article.query.options(*article_summary_options()).filter(
+        Article.id.in_([article_id for article_id, _ in top]), Article.status == PUBLISHED
+    ).all()
+    found = {article.id: article for article in found}
+    prime_tag_cache(tag_id for article in found.values() for tag_id in article.tag_ids or ())
+
+    articles = []
+    for article_id, score in top:
+        # Skips articles unpublished since the last refresh
+        if article_id in found:
+            articles.append({**serialize_article_summary(found[article_id]), "score": round(score, 3)})
+
+    response = jsonify({"window": window, "articles": articles})
+    tags = set()
+    for article in found.values():
+        tags.add(article_cache_tag(article.id))
+        tags.add(author_cache_tag(article.author_id))
+    return cache_response(key, response, tags)
+
+
+# /articles/<id>/related?limit= [GET] - Published articles sharing the most
+# (and rarest) tags with this one, newer ones first among equals. The lists
+# are precomputed (utils/related.py), this is one indexed read.
+@articles_bp.route("/<int:article_id>/related", methods=["GET"])
+def related_articles(article_id):
+    if not related_enabled():
+        return jsonify({"error": "Related articles are disabled"}), 501
+    size = current_app.config["RELATED_SIZE"]
+    limit = request.args.get("limit", size, type=int)
+    if limit is None or limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit, size)
+
+    key = cache_key("articles.related", article_id=article_id, limit=limit)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+
+    rows = db.session.execute(
+        db.select(Article, RelatedArticle.score)
+        .options(*article_summary_options())
+        .join(RelatedArticle, RelatedArticle.related_id == Article.id)
+        .where(RelatedArticle.article_id == article_id, Article.status == PUBLISHED)
+        .order_by(RelatedArticle.score.desc(), Article.id.desc())
+        .limit(limit)
+    ).all()
+    if not rows and db.session.query(Article.id).filter_by(id=article_id).scalar() is None:
+        return jsonify({"error": "Article not found"}), 404
+    prime_tag_cache(tag_id for article, _ in rows for tag_id in article.tag_ids or ())
+
+    response = jsonify({"articles": [
+        {**serialize_article_summary(article), "score": round(score, 4)} for article, score in rows
+    ]})
+    tags = {related_cache_tag(article_id)}
+    for article, _ in rows:
+        tags.add(article_cache_tag(article.id))
+        tags.add(author_cache_tag(article.author_id))
+    return cache_response(key, response, tags)
+
+
+# /articles/export [GET] - Streams every matching article, content included,
+# without building the result in memory. ?format=json (default) sends one
+# JSON array, ?format=ndjson one article per line. Published articles are
+# public; any other ?status (or all of them with an empty one) needs a
+# login and only exports the logged-in author's own articles.
+@articles_bp.route("/export", methods=["GET"])
+@jwt_required(optional=True)
+def export_articles():
+    status = request.args.get("status", "published", type=str)
+    export_format = request.args.get("format", "json", type=str)
+    if export_format not in ("json", "ndjson"):
+        return jsonify({"error": "format must be either 'json' or 'ndjson'"}), 400
+
+    query = Article.query.options(*article_detail_options())
+    if status != PUBLISHED:
+        user = get_current_user()
+        if user is None:
+            return jsonify({"error": "Log in to export unpublished articles"}), 401
+        query = query.filter_by(author_id=user.id)
+    if status:
+        query = query.filter_by(status=status)
+
+    stream = stream_ndjson if export_format == "ndjson" else stream_json_array
+    return stream(query.order_by(Article.id), serialize_article_detail)
+
+
+# /articles/bulk [POST] - Imports NDJSON, one article per line in the
+# POST /articles format, for the logged-in author. Rows are inserted in
+# batched transactions; invalid rows are skipped and reported by line.
+@articles_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def bulk_import_articles():
+    # request.stream reads byte by byte when iterated by line, so buffer it
+    body = io.BufferedReader(request.stream, buffer_size=STREAM_READ_SIZE)
+    lines = (line.decode("utf-8", "replace") for line in body)
+    result = import_articles(lines, current_user.id)
+
+    if result.imported:
+        author_ids = [current_user.id] if PUBLISHED in result.statuses else []
+        invalidate_articles(statuses=result.statuses, tag_slugs=result.tag_slugs, author_ids=author_ids)
+        mark_related(result.article_ids)
+    return jsonify(result.as_dict())
+
+
+# /articles/cache/stats [GET] - Hit/miss counters of the response cache
+@articles_bp.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    cache = get_cache()
+    return jsonify({
+        "backend": cache.name,
+        **cache.stats.as_dict(),
+        "slug_map": get_slug_cache().stats.as_dict(),
+    })
 
 
 # /articles [POST]
@@ -57,106 +306,147 @@ def get_articles():
 @jwt_required()
 def create_article():
     data = request.get_json()
-    author_id = get_jwt_identity()
+
+    try:
+        publish_at = parse_publish_at(data["publishAt"]) if data.get("publishAt") else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "publishAt must be an ISO 8601 datetime"}), 400
+    # The publisher only picks up scheduled articles with a date
+    if data.get("status") == SCHEDULED and publish_at is None:
+        return jsonify({"error": "publishAt is required for scheduled articles"}), 400
 
     article = Article(
         title=data["title"],
         slug=data["slug"],
-        excerpt=data["excerpt"],
+        excerpt=data.get("excerpt") or "",
         featured_image_url=data["featuredImageUrl"],
-        read_time_minutes=data["readTimeMinutes"],
         status=data["status"],
         content=data["content"],
-        author_id=int(author_id),
+        author_id=current_user.id,
         published_at=None
     )
+    # Sets published_at, or schedules the article for a future publishAt
+    apply_publish_at(article, publish_at)
+    # Read time (and the excerpt unless one was given) come from the body
+    refresh_content_metadata(article, keep_excerpt=bool(data.get("excerpt")))
+
+    # ['Javascript', 'React', 'Python'], stored on the row with the INSERT
+    tags = resolve_tags(data.get("tags", []))
+    article.tag_ids = [tag.id for tag in tags]
 
     db.session.add(article)
     db.session.flush()
 
-    # ['Javascript', 'React', 'Python']
-    tags = data.get("tags")
-    for tag_name in tags:
-        tag = Tag.query.filter_by(title=tag_name).first()
-        if not tag:
-            tag = Tag(title=tag_name, slug=slugify(tag_name))
-            db.session.add(tag)
-            db.session.flush()
-
-        article_tag = ArticleTag(
-            article_id = article.id,
-            tag_id = tag.id
-        )
-        db.session.add(article_tag)
+    changed_tag_slugs = link_new_articles([(article, tags)])
+    index_article(article, [tag.title for tag in tags])
 
     db.session.commit()
+    # The author's profile and public listing only show published articles
+    author_ids = [article.author_id] if article.status == PUBLISHED else []
+    invalidate_articles(statuses=[article.status], tag_slugs=changed_tag_slugs, author_ids=author_ids)
+    if tags:
+        mark_related([article.id])
     
     return jsonify({
         "message": "Article successfully created!",
-        "article": {
-            "id": article.id,
-            "title": article.title,
-            "slug": article.slug,
-            "excerpt": article.excerpt,
-            "featured_image_url": article.featured_image_url,
-            "read_time_minutes": article.read_time_minutes,
-            "status": article.status,
-            "content": article.content,
-            "author_id": article.author_id,
-            "published_at": article.published_at,
-        }
+        "article": serialize_own_article(article),
     })
 
 
-
 @articles_bp.route("/<int:article_id>", methods=["GET"])
 def get_article_route(article_id):
-    article = Article.query.filter_by(id=article_id).first()
-    if not article:
+    return article_response(article_id)
+
+
+# /articles/by-slug/<slug> [GET] - Same payload as /articles/<id>
+@articles_bp.route("/by-slug/<slug>", methods=["GET"])
+def get_article_by_slug_route(slug):
+    slug_cache = get_slug_cache()
+    article_id = slug_cache.get(slug)
+    if article_id is not None:
+        # The map is per process and only the worker that renamed an article
+        # evicted its old slug, so a cached id is checked against the article
+        response = article_response(article_id, expected_slug=slug)
+        if response is not None:
+            return response
+        slug_cache.delete(slug)
+
+    # Point lookup on the unique slug index, nothing else is read
+    article_id = db.session.query(Article.id).filter_by(slug=slug).scalar()
+    if article_id is None:
         return jsonify({"error": "Article not found"}), 404
+    slug_cache.set(slug, article_id)
+    return article_response(article_id)
+
+
+# With `expected_slug`, returns None instead when the article no longer has
+# that slug
+def article_response(article_id, expected_slug=None):
+    key = cache_key("articles.detail", article_id=article_id)
+    # The slug is stored next to the cached body, checking it parses nothing
+    cached, cached_slug = cached_response_with(key)
+    if cached is not None:
+        if expected_slug is not None and cached_slug != expected_slug:
+            return None
+        record_view(article_id)
+        return cached.make_conditional(request)
+
+    etag, last_modified = article_validators(article_id)
+    if etag is None:
+        return None if expected_slug is not None else (jsonify({"error": "Article not found"}), 404)
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified is not None:
+        if expected_slug is not None and (
+            db.session.query(Article.slug).filter_by(id=article_id).scalar() != expected_slug
+        ):
+            return None
+        # In-memory increment, written to the database in batches later
+        record_view(article_id)
+        return not_modified
+
+    article = Article.query.options(*article_detail_options()).filter_by(id=article_id).first()
+    if not article:
+        return None if expected_slug is not None else (jsonify({"error": "Article not found"}), 404)
+    if expected_slug is not None and article.slug != expected_slug:
+        return None
+    record_view(article_id)
     
-    article_tags = []
-    for article_tag in article.article_tags:
-        article_tags.append({
-            "id": article_tag.tag.id,
-            "title": article_tag.tag.title,
-            "slug": article_tag.tag.slug,
-        })
-    
-    return jsonify({
-            "id": article.id,
-            "title": article.title,
-            "slug": article.slug,
-            "excerpt": article.excerpt,
-            "featured_image_url": article.featured_image_url,
-            "read_time_minutes": article.read_time_minutes,
-            "status": article.status,
-            "content": article.content,
-            "author": {
-                "id": article.author.id,
-                "name": article.author.name,
-                "email": article.author.email,
-                "avatar": article.author.avatar,
-            },
-            "published_at": article.published_at,
-            "tags": article_tags
-    })
+    response = jsonify(serialize_article_detail(article))
+    set_validators(response, etag, last_modified)
+    return cache_response(
+        key, response, [article_cache_tag(article.id), author_cache_tag(article.author_id)], extra=article.slug,
+    )
 
 
 # /articles/<id> [PUT]
 @articles_bp.route("/<int:article_id>", methods=["PUT"])
 @jwt_required()
 def edit_article(article_id):
-    author_id = get_jwt_identity()
-    article = Article.query.filter_by(id=article_id).first()
+    article = db.session.get(Article, article_id)
     
     if not article:
         return jsonify({"error": "Article not found"}), 404
     
-    if article.author_id != int(author_id):
+    if article.author_id != current_user.id:
         return jsonify({"error": "Unauthorized: You can only edit your own articles"}), 403
     
     data = request.get_json()
+    try:
+        publish_at = parse_publish_at(data["publishAt"]) if data.get("publishAt") else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "publishAt must be an ISO 8601 datetime"}), 400
+    # Keeping an already scheduled article scheduled needs no new date
+    if data.get("status") == SCHEDULED and publish_at is None and (
+        article.status != SCHEDULED or article.published_at is None
+    ):
+        return jsonify({"error": "publishAt is required for scheduled articles"}), 400
+
+    old_slug = article.slug
+    old_status = article.status
+    old_published_at = article.published_at
+    old_content = article.content
+    old_excerpt = article.excerpt
+    changed_tag_slugs = set()
     
     # Update article fields if provided
     if "title" in data:
@@ -167,54 +457,67 @@ def edit_article(article_id):
         article.excerpt = data["excerpt"]
     if "featuredImageUrl" in data:
         article.featured_image_url = data["featuredImageUrl"]
-    if "readTimeMinutes" in data:
-        article.read_time_minutes = data["readTimeMinutes"]
     if "status" in data:
         article.status = data["status"]
     if "content" in data:
         article.content = data["content"]
+    apply_publish_at(article, publish_at)
+
+    # readTimeMinutes is derived on the server now and ignored if sent. A
+    # generated excerpt follows the new body, a custom one is kept.
+    if "content" in data and article.content != old_content:
+        if "excerpt" in data:
+            keep_excerpt = bool(data["excerpt"])
+        else:
+            keep_excerpt = not is_generated_excerpt(old_excerpt, old_content)
+        refresh_content_metadata(article, keep_excerpt=keep_excerpt)
+    elif "excerpt" in data and not data["excerpt"]:
+        article.excerpt = make_excerpt(plain_text(article.content))
     
-    # Handle tags update if provided
+    # Handle tags update if provided, only the links that changed are written
+    tags = None
     if "tags" in data:
-        # Remove all existing article tags
-        ArticleTag.query.filter_by(article_id=article.id).delete()
-        
-        # Add new tags
-        tags = data.get("tags")
-        for tag_name in tags:
-            tag = Tag.query.filter_by(title=tag_name).first()
-            if not tag:
-                tag = Tag(title=tag_name, slug=slugify(tag_name))
-                db.session.add(tag)
-                db.session.flush()
-            
-            article_tag = ArticleTag(
-                article_id=article.id,
-                tag_id=tag.id
-            )
-            db.session.add(article_tag)
+        tags, changed_tag_slugs = set_article_tags(
+            article, data["tags"], was_published=old_status == PUBLISHED,
+        )
+        if changed_tag_slugs:
+            # Tags live in another table, bump the article so its validators change
+            article.updated_at = utcnow()
+    elif article.status != old_status:
+        changed_tag_slugs = update_article_tag_counts(
+            article.id, old_status == PUBLISHED, article.status == PUBLISHED,
+        )
+
+    # Keep the search index row in the same transaction as the edit
+    if {"title", "excerpt", "content", "tags"} & data.keys():
+        if tags is None:
+            tag_titles = [tag["title"] for tag in tags_for(article.tag_ids)]
+        else:
+            tag_titles = [tag.title for tag in tags]
+        index_article(article, tag_titles)
     
     db.session.commit()
     
-    # Fetch updated tags to return
-    article_tags = []
-    for article_tag in article.article_tags:
-        article_tags.append({
-            "id": article_tag.tag.id,
-            "title": article_tag.tag.title,
-            "slug": article_tag.tag.slug,
-        })
+    article_tags = tags_for(article.tag_ids)
+
+    if article.slug != old_slug:
+        get_slug_cache().delete(old_slug)
+
+    # Listings already showing this article are tagged with it, so only a
+    # status or date change (article moves to other listings or pages) or a
+    # tag change (it joins or leaves tag listings) needs anything more
+    statuses = set()
+    if article.status != old_status or article.published_at != old_published_at:
+        statuses = {old_status, article.status}
+    # Same for the author's page and profile aggregates (count, latest date,
+    # top tags)
+    author_ids = [article.author_id] if statuses or changed_tag_slugs else []
+    invalidate_articles(
+        article_ids=[article.id], statuses=statuses, tag_slugs=changed_tag_slugs, author_ids=author_ids,
+    )
+    # Related lists follow tag changes and the article entering or leaving
+    # the published set, in the background
+    if changed_tag_slugs or article.status != old_status:
+        mark_related([article.id])
     
-    return jsonify({
-            "id": article.id,
-            "title": article.title,
-            "slug": article.slug,
-            "excerpt": article.excerpt,
-            "featured_image_url": article.featured_image_url,
-            "read_time_minutes": article.read_time_minutes,
-            "status": article.status,
-            "content": article.content,
-            "author_id": article.author_id,
-            "published_at": article.published_at,
-            "tags": article_tags
-    })
\ No newline at end of file
+    return jsonify({**serialize_own_article(article), "tags": article_tags})
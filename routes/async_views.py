@@ -0,0 +1,122 @@
+from flask import jsonify, request
+from flask_jwt_extended import current_user, jwt_required
+from sqlalchemy import select
+
+from models import Article
+from routes.articles import listing_args, listing_cache_tags
+from utils.async_db import get_async_session, init_async_db
+from utils.cache import article_cache_tag, author_cache_tag, cache_key, cache_response, cached_response
+from utils.conditional import not_modified_response, set_validators
+from utils.metrics import timed_serialization
+from utils.pagination import paginate_articles_async
+from utils.queries import (
+    article_detail_options, article_summary_options, article_validators_of, article_validators_query,
+    listing_validators_of, listing_validators_query,
+)
+from utils.serializers import serialize_article_detail, serialize_article_summary, serialize_user
+from utils.tags import filter_by_tags, prime_tag_cache_async
+from utils.views import record_view
+
+# Async versions of the hottest read endpoints. Same arguments, cache
+# entries, validators and payloads as the sync views in routes/articles.py
+# and routes/auth.py; only the queries go through the asyncio engine. Tags
+# are primed asynchronously before serializing, so the serializers never
+# fall back to a sync query.
+
+
+# /articles [GET]
+async def get_articles():
+    try:
+        status, limit, cursor, tag_slugs, match_all = listing_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    key = cache_key("articles.list", request.args)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached.make_conditional(request)
+
+    async with get_async_session() as session:
+        row = (await session.execute(listing_validators_query(status))).one()
+        etag, last_modified = listing_validators_of(key, row)
+        not_modified = not_modified_response(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        statement = select(Article).options(*article_summary_options())
+        if status:
+            statement = statement.where(Article.status == status)
+        if tag_slugs:
+            statement = filter_by_tags(statement, tag_slugs, match_all=match_all)
+
+        page, next_cursor = await paginate_articles_async(session, statement, limit, cursor)
+        await prime_tag_cache_async(session, (tag_id for article in page for tag_id in article.tag_ids or ()))
+
+    with timed_serialization():
+        articles = [serialize_article_summary(article) for article in page]
+
+    response = jsonify({
+        "articles": articles,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
+    set_validators(response, etag, last_modified)
+    return cache_response(key, response, listing_cache_tags(status, tag_slugs, page))
+
+
+# /articles/<id> [GET]
+async def get_article(article_id):
+    key = cache_key("articles.detail", article_id=article_id)
+    cached = cached_response(key)
+    if cached is not None:
+        record_view(article_id)
+        return cached.make_conditional(request)
+
+    async with get_async_session() as session:
+        row = (await session.execute(article_validators_query(article_id))).first()
+        etag, last_modified = article_validators_of(article_id, row)
+        if etag is None:
+            return jsonify({"error": "Article not found"}), 404
+        record_view(article_id)
+        not_modified = not_modified_response(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        article = await session.scalar(
+            select(Article).options(*article_detail_options()).where(Article.id == article_id).limit(1)
+        )
+        if not article:
+            return jsonify({"error": "Article not found"}), 404
+        await prime_tag_cache_async(session, article.tag_ids or ())
+
+    response = jsonify(serialize_article_detail(article))
+    set_validators(response, etag, last_modified)
+    # Same entry as the sync view, slug included for /articles/by-slug
+    return cache_response(
+        key, response, [article_cache_tag(article.id), author_cache_tag(article.author_id)], extra=article.slug,
+    )
+
+
+# /auth/me [GET]. current_user comes from the identity cache shared with the
+# sync routes; a miss is one primary key lookup before the view starts.
+@jwt_required()
+async def get_current_user():
+    return jsonify(serialize_user(current_user))
+
+
+ASYNC_VIEWS = {
+    "articles.get_articles": get_articles,
+    "articles.get_article_route": get_article,
+    "auth.get_current_user": get_current_user,
+}
+
+
+# ASYNC_VIEWS: swaps these in for the sync views under the same URL rules
+# and endpoint names, so metrics labels, url_for and the cache keys do not
+# change. Call after the blueprints are registered.
+def init_async_views(app):
+    app.config.setdefault("ASYNC_VIEWS", False)
+    if not app.config["ASYNC_VIEWS"]:
+        return
+    init_async_db(app)
+    app.view_functions.update(ASYNC_VIEWS)
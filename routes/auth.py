@@ -1,10 +1,19 @@
 from flask import request, jsonify,Blueprint
 from models import db, User
-from utils.auth import hash_password, verify_password
-from flask_jwt_extended import create_access_token, create_refresh_token, set_access_cookies, set_refresh_cookies, jwt_required, get_jwt_identity, unset_jwt_cookies
+from utils.auth import PasswordHasherBusy, dummy_verify, hash_password, password_needs_rehash, verify_password
+from utils.cache import invalidate_articles
+from utils.identity import invalidate_identity
+from utils.ratelimit import get_limiter
+from utils.serializers import serialize_user
+from flask_jwt_extended import create_access_token, create_refresh_token, set_access_cookies, set_refresh_cookies, jwt_required, get_jwt_identity, unset_jwt_cookies, current_user
 
 auth_bp = Blueprint("auth", __name__)
 
+def busy_response():
+    response = jsonify({"error": "Server is busy, try again shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
 @auth_bp.route("/register", methods=["POST"])
 def create_user_route():
     data = request.get_json()
@@ -19,7 +28,12 @@ def create_user_route():
     if existing_user:
         return jsonify({"error": "User with this email already exists!"})
     
-    user = User(email=email, password_hash=hash_password(password), name=name)
+    try:
+        password_hash = hash_password(password)
+    except PasswordHasherBusy:
+        return busy_response()
+
+    user = User(email=email, password_hash=password_hash, name=name)
     db.session.add(user)
     db.session.commit()
 
@@ -34,18 +48,48 @@ def create_user_route():
 @auth_bp.route("/login", methods=["POST"])
 def login():
     data = request.get_json()
-    if not data or not data.get("email") or not data.get("password"):
+    if not isinstance(data, dict) or not data.get("email") or not data.get("password"):
         return jsonify({"error": "Email and password are required!"}), 400
 
     email = data.get("email")
     password = data.get("password")
-
-    user = User.query.filter_by(email=email).first()
-    if not user:
+    # No user has a non-string email or password, answered like any other
+    # failed login but before the throttle keys and bcrypt need strings
+    if not isinstance(email, str) or not isinstance(password, str):
         return jsonify({"error": "Invalid credentials!"}), 401
 
-    if not verify_password(password, user.password_hash):
-        return jsonify({"error": "Invalid credentials!"}), 401
+    # Throttle before touching the database or bcrypt, so credential
+    # stuffing cannot turn into CPU exhaustion
+    ip_limiter = get_limiter("LOGIN_RATE_LIMIT_PER_IP")
+    email_limiter = get_limiter("LOGIN_FAILURE_LIMIT_PER_EMAIL")
+    email_key = email.strip().lower()
+    retry_after = ip_limiter.blocked_for(request.remote_addr) or email_limiter.blocked_for(email_key)
+    if retry_after:
+        response = jsonify({"error": "Too many login attempts, try again later"})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 429
+    ip_limiter.hit(request.remote_addr)
+
+    user = User.query.filter_by(email=email).first()
+    try:
+        if not user:
+            # Same bcrypt cost as a real check, unknown emails are not faster
+            valid = dummy_verify(password)
+        else:
+            valid = verify_password(password, user.password_hash)
+
+        if not valid:
+            email_limiter.hit(email_key)
+            return jsonify({"error": "Invalid credentials!"}), 401
+
+        # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the password
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
+    except PasswordHasherBusy:
+        return busy_response()
+
+    email_limiter.reset(email_key)
 
     access = create_access_token(identity=str(user.id))
     refresh = create_refresh_token(identity=str(user.id))
@@ -82,25 +126,13 @@ def logout():
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
 def get_current_user():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
-    return jsonify({
-        "id": user.id,
-        "email": user.email,
-        "name": user.name,
-        "avatar": user.avatar,
-        "created_at": user.created_at.isoformat() if user.created_at else None
-    })
+    # Resolved by the user_lookup_loader, usually from the identity cache
+    return jsonify(serialize_user(current_user))
 
 @auth_bp.route("/me", methods=["PUT"])
 @jwt_required()
 def update_user():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = db.session.get(User, current_user.id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -114,14 +146,11 @@ def update_user():
         user.avatar = data["avatar"]
 
     db.session.commit()
+    invalidate_identity(user.id)
+    # Article responses embed the author's name and avatar
+    invalidate_articles(author_ids=[user.id])
 
     return jsonify({
         "message": "Profile updated successfully",
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "avatar": user.avatar,
-            "created_at": user.created_at.isoformat() if user.created_at else None
-        }
+        "user": serialize_user(user),
     })
\ No newline at end of file
@@ -0,0 +1,11 @@
+from flask import Blueprint
+
+from utils.metrics import get_metrics
+
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# /metrics [GET] - Prometheus scrape endpoint for this worker process
+@metrics_bp.route("", methods=["GET"])
+def metrics():
+    return get_metrics().render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+
+from models import Tag
+from utils.cache import TAG_LIST_CACHE_TAG, cache_key, cache_response, cached_response
+from utils.serializers import serialize_tag_with_count
+
+
+tags_bp = Blueprint("tags", __name__)
+
+# /tags [GET] - Public endpoint listing tags with their published article count
+@tags_bp.route("", methods=["GET"])
+def get_tags():
+    key = cache_key("tags.list")
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+
+    # Counts are maintained on article writes, no COUNT over article_tag here
+    tags = Tag.query.order_by(Tag.article_count.desc(), Tag.title).all()
+
+    response = jsonify([serialize_tag_with_count(tag) for tag in tags])
+    return cache_response(key, response, [TAG_LIST_CACHE_TAG])
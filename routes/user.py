@@ -1,31 +1,122 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import current_user, jwt_required
+from sqlalchemy import func, select
+from sqlalchemy.orm import load_only, raiseload
 
-from models import ArticleTag, Tag, db, Article
-from slugify import slugify
+from models import Article, ArticleTag, User, db
+from utils.cache import article_cache_tag, author_cache_tag, cache_key, cache_response, cached_response
+from utils.metrics import timed_serialization
+from utils.pagination import get_page_args, paginate_articles
+from utils.queries import article_summary_options
+from utils.serializers import (
+    serialize_article_summary, serialize_author, serialize_own_article, serialize_own_article_summary,
+)
+from utils.tags import PUBLISHED, prime_tag_cache, tags_for
 
 
 users_bp = Blueprint("users", __name__)
 
+# Tags listed on an author profile
+TOP_TAGS_SIZE = 5
+
 @users_bp.route("/articles")
 @jwt_required()
 def user_articles():
-    user_id = get_jwt_identity()
-    articles = Article.query.filter_by(author_id=int(user_id)).all()
-
-    user_articles = []
-    for article in articles:
-        user_articles.append({
-            "id": article.id,
-            "title": article.title,
-            "slug": article.slug,
-            "excerpt": article.excerpt,
-            "featured_image_url": article.featured_image_url,
-            "read_time_minutes": article.read_time_minutes,
-            "status": article.status,
-            "published_at": article.published_at,
-            "content": article.content,
-            "author_id": article.author_id,
-        })
-
-    return user_articles
\ No newline at end of file
+    try:
+        limit, cursor = get_page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ?fields=summary skips the article bodies entirely
+    fields = request.args.get("fields", "full", type=str)
+    if fields not in ("full", "summary"):
+        return jsonify({"error": "fields must be either 'full' or 'summary'"}), 400
+
+    # Only plain columns are returned, so make sure no relationship can be
+    # lazy loaded per row
+    query = Article.query.filter_by(author_id=current_user.id)
+    if fields == "summary":
+        query = query.options(*article_summary_options(with_related=False))
+    else:
+        query = query.options(raiseload("*"))
+    articles, next_cursor = paginate_articles(query, limit, cursor)
+
+    serialize = serialize_own_article if fields == "full" else serialize_own_article_summary
+    with timed_serialization():
+        user_articles = [serialize(article) for article in articles]
+
+    return jsonify({
+        "articles": user_articles,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
+
+# /users/<id> [GET] - Public author profile with the number of published
+# articles, the latest publication date and the tags the author uses most.
+# The aggregates are read from the author/status index and article_tag on
+# a cache miss; the entry is dropped whenever the author's published set
+# changes (invalidate_articles(author_ids=...)).
+@users_bp.route("/<int:user_id>", methods=["GET"])
+def author_profile(user_id):
+    key = cache_key("users.profile", user_id=user_id)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+
+    user = db.session.get(User, user_id, options=[load_only(User.id, User.name, User.email, User.avatar)])
+    if user is None:
+        return jsonify({"error": "User not found"}), 404
+
+    published = (Article.author_id == user_id, Article.status == PUBLISHED)
+    article_count, latest_published_at = db.session.execute(
+        select(func.count(), func.max(Article.published_at)).where(*published)
+    ).one()
+    top_tags = db.session.execute(
+        select(ArticleTag.tag_id, func.count().label("articles"))
+        .join(Article, ArticleTag.article_id == Article.id)
+        .where(*published)
+        .group_by(ArticleTag.tag_id)
+        .order_by(func.count().desc(), ArticleTag.tag_id)
+        .limit(TOP_TAGS_SIZE)
+    ).all()
+    prime_tag_cache(tag_id for tag_id, _ in top_tags)
+    counts = dict(top_tags)
+
+    response = jsonify({
+        **serialize_author(user),
+        "article_count": article_count,
+        "latest_published_at": latest_published_at,
+        "top_tags": [{**tag, "count": counts[tag["id"]]} for tag in tags_for(list(counts))],
+    })
+    return cache_response(key, response, [author_cache_tag(user_id)])
+
+
+# /users/<id>/articles [GET] - The author's published articles as listing
+# cards, newest first, with the same ?limit= / ?cursor= paging as /articles
+@users_bp.route("/<int:user_id>/articles", methods=["GET"])
+def author_articles(user_id):
+    try:
+        limit, cursor = get_page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    key = cache_key("users.author_articles", request.args, user_id=user_id)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+
+    query = Article.query.options(*article_summary_options()).filter(
+        Article.author_id == user_id, Article.status == PUBLISHED
+    )
+    articles, next_cursor = paginate_articles(query, limit, cursor)
+    if not articles and db.session.query(User.id).filter_by(id=user_id).scalar() is None:
+        return jsonify({"error": "User not found"}), 404
+    prime_tag_cache(tag_id for article in articles for tag_id in article.tag_ids or ())
+
+    with timed_serialization():
+        payload = [serialize_article_summary(article) for article in articles]
+
+    response = jsonify({"articles": payload, "limit": limit, "next_cursor": next_cursor})
+    tags = {author_cache_tag(user_id)}
+    tags.update(article_cache_tag(article.id) for article in articles)
+    return cache_response(key, response, tags)
@@ -1,144 +1,318 @@
-from datetime import datetime
-from app import app, db
-from models import User, Article, Tag, ArticleTag
+from datetime import datetime, timedelta
+from app import create_app
+from models import db, User, Article, ArticleViewCount, RelatedArticle, Tag, ArticleTag, utcnow
 from slugify import slugify
+from sqlalchemy import insert
+from utils.content import content_hash, make_excerpt, plain_text, read_time, refresh_content_metadata
+from utils.related import rebuild_related, related_enabled
+from utils.schema import upgrade
+from utils.search import rebuild_search_index, search_enabled
+from utils.tags import linked_tag_ids, recount_tags
+import argparse
 import bcrypt
+import random
+import sys
 
 def hash_password(password):
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 def seed_database():
-    with app.app_context():
-        # Clear existing data
-        ArticleTag.query.delete()
-        Article.query.delete()
-        Tag.query.delete()
-        User.query.delete()
-        
-        print("Creating users...")
-        users = [
-            User(
-                email="john@example.com",
-                password_hash=hash_password("password123"),
-                name="John Doe",
-                role="user"
-            ),
-            User(
-                email="jane@example.com",
-                password_hash=hash_password("password123"),
-                name="Jane Smith",
-                role="user"
-            )
-        ]
-        db.session.add_all(users)
-        db.session.flush()
-        
-        print("Creating tags...")
-        tags = [
-            Tag(title="Python", slug=slugify("Python")),
-            Tag(title="JavaScript", slug=slugify("JavaScript")),
-            Tag(title="React", slug=slugify("React")),
-            Tag(title="Backend", slug=slugify("Backend")),
-            Tag(title="Frontend", slug=slugify("Frontend")),
-            Tag(title="Web Development", slug=slugify("Web Development")),
-        ]
-        db.session.add_all(tags)
-        db.session.flush()
-        
-        print("Creating articles...")
-        articles = [
-            Article(
-                title="Getting Started with Python",
-                slug=slugify("Getting Started with Python"),
-                excerpt="Learn the basics of Python programming language",
-                featured_image_url="https://placehold.co/800x400?text=Python&bg=3776AB&fg=FFFFFF",
-                read_time_minutes=5,
-                status="published",
-                content="Python is a versatile and beginner-friendly programming language. In this article, we'll explore the fundamentals of Python and get you started on your programming journey.",
-                author_id=users[0].id,
-                published_at=datetime.now()
-            ),
-            Article(
-                title="Building React Components",
-                slug=slugify("Building React Components"),
-                excerpt="Master the art of creating reusable React components",
-                featured_image_url="https://placehold.co/800x400?text=React&bg=61DAFB&fg=000000",
-                read_time_minutes=8,
-                status="published",
-                content="React components are the building blocks of modern web applications. Learn how to create functional and class-based components, manage state, and handle events effectively.",
-                author_id=users[1].id,
-                published_at=datetime.now()
-            ),
-            Article(
-                title="RESTful API Design Best Practices",
-                slug=slugify("RESTful API Design Best Practices"),
-                excerpt="Design scalable and maintainable REST APIs",
-                featured_image_url="https://placehold.co/800x400?text=API&bg=009688&fg=FFFFFF",
-                read_time_minutes=10,
-                status="published",
-                content="Designing a good REST API is crucial for building scalable web applications. This article covers best practices including resource naming, HTTP methods, status codes, and versioning strategies.",
-                author_id=users[0].id,
-                published_at=datetime.now()
-            ),
-            Article(
-                title="JavaScript ES6 Features",
-                slug=slugify("JavaScript ES6 Features"),
-                excerpt="Explore modern JavaScript features that improve code quality",
-                featured_image_url="https://placehold.co/800x400?text=JavaScript&bg=F7DF1E&fg=000000",
-                read_time_minutes=7,
-                status="published",
-                content="ES6 (ES2015) introduced many powerful features to JavaScript including arrow functions, classes, template literals, destructuring, and promises. Discover how these features can make your code more readable and efficient.",
-                author_id=users[1].id,
-                published_at=datetime.now()
-            ),
-            Article(
-                title="Database Optimization Techniques",
-                slug=slugify("Database Optimization Techniques"),
-                excerpt="Tips for optimizing database queries and performance",
-                featured_image_url="https://placehold.co/800x400?text=Database&bg=336791&fg=FFFFFF",
-                read_time_minutes=12,
-                status="published",
-                content="Database performance is critical for application speed. Learn about indexing, query optimization, caching strategies, and database design patterns to improve your application's performance.",
-                author_id=users[0].id,
-                published_at=datetime.now()
-            ),
-            Article(
-                title="Introduction to Flask Framework",
-                slug=slugify("Introduction to Flask Framework"),
-                excerpt="Build lightweight web applications with Flask",
-                featured_image_url="https://placehold.co/800x400?text=Flask&bg=000000&fg=FFFFFF",
-                read_time_minutes=6,
-                status="published",
-                content="Flask is a lightweight web framework for Python that makes it easy to build web applications. This guide covers the basics of routing, request handling, templates, and database integration.",
-                author_id=users[1].id,
-                published_at=datetime.now()
-            ),
-        ]
-        db.session.add_all(articles)
-        db.session.flush()
-        
-        print("Linking articles with tags...")
-        # Link articles with tags
-        article_tags_map = [
-            (articles[0], [tags[0]]),  # Python
-            (articles[1], [tags[1], tags[2], tags[4]]),  # JavaScript, React, Frontend
-            (articles[2], [tags[3], tags[5]]),  # Backend, Web Development
-            (articles[3], [tags[1]]),  # JavaScript
-            (articles[4], [tags[3], tags[5]]),  # Backend, Web Development
-            (articles[5], [tags[0], tags[3], tags[5]]),  # Python, Backend, Web Development
-        ]
-        
-        for article, article_tags in article_tags_map:
-            for tag in article_tags:
-                article_tag = ArticleTag(article_id=article.id, tag_id=tag.id)
-                db.session.add(article_tag)
-        
-        db.session.commit()
-        print("✅ Database seeded successfully!")
-        print(f"Created {len(users)} users")
-        print(f"Created {len(tags)} tags")
-        print(f"Created {len(articles)} articles")
+    # Creates or migrates the schema first, the app does not on import
+    upgrade()
+
+    # Clear existing data
+    RelatedArticle.query.delete()
+    ArticleViewCount.query.delete()
+    ArticleTag.query.delete()
+    Article.query.delete()
+    Tag.query.delete()
+    User.query.delete()
+    
+    print("Creating users...")
+    users = [
+        User(
+            email="john@example.com",
+            password_hash=hash_password("password123"),
+            name="John Doe",
+            role="user"
+        ),
+        User(
+            email="jane@example.com",
+            password_hash=hash_password("password123"),
+            name="Jane Smith",
+            role="user"
+        )
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+    
+    print("Creating tags...")
+    tags = [
+        Tag(title="Python", slug=slugify("Python")),
+        Tag(title="JavaScript", slug=slugify("JavaScript")),
+        Tag(title="React", slug=slugify("React")),
+        Tag(title="Backend", slug=slugify("Backend")),
+        Tag(title="Frontend", slug=slugify("Frontend")),
+        Tag(title="Web Development", slug=slugify("Web Development")),
+    ]
+    db.session.add_all(tags)
+    db.session.flush()
+    
+    print("Creating articles...")
+    articles = [
+        Article(
+            title="Getting Started with Python",
+            slug=slugify("Getting Started with Python"),
+            excerpt="Learn the basics of Python programming language",
+            featured_image_url="https://placehold.co/800x400?text=Python&bg=3776AB&fg=FFFFFF",
+            read_time_minutes=5,
+            status="published",
+            content="Python is a versatile and beginner-friendly programming language. In this article, we'll explore the fundamentals of Python and get you started on your programming journey.",
+            author_id=users[0].id,
+            published_at=datetime.now()
+        ),
+        Article(
+            title="Building React Components",
+            slug=slugify("Building React Components"),
+            excerpt="Master the art of creating reusable React components",
+            featured_image_url="https://placehold.co/800x400?text=React&bg=61DAFB&fg=000000",
+            read_time_minutes=8,
+            status="published",
+            content="React components are the building blocks of modern web applications. Learn how to create functional and class-based components, manage state, and handle events effectively.",
+            author_id=users[1].id,
+            published_at=datetime.now()
+        ),
+        Article(
+            title="RESTful API Design Best Practices",
+            slug=slugify("RESTful API Design Best Practices"),
+            excerpt="Design scalable and maintainable REST APIs",
+            featured_image_url="https://placehold.co/800x400?text=API&bg=009688&fg=FFFFFF",
+            read_time_minutes=10,
+            status="published",
+            content="Designing a good REST API is crucial for building scalable web applications. This article covers best practices including resource naming, HTTP methods, status codes, and versioning strategies.",
+            author_id=users[0].id,
+            published_at=datetime.now()
+        ),
+        Article(
+            title="JavaScript ES6 Features",
+            slug=slugify("JavaScript ES6 Features"),
+            excerpt="Explore modern JavaScript features that improve code quality",
+            featured_image_url="https://placehold.co/800x400?text=JavaScript&bg=F7DF1E&fg=000000",
+            read_time_minutes=7,
+            status="published",
+            content="ES6 (ES2015) introduced many powerful features to JavaScript including arrow functions, classes, template literals, destructuring, and promises. Discover how these features can make your code more readable and efficient.",
+            author_id=users[1].id,
+            published_at=datetime.now()
+        ),
+        Article(
+            title="Database Optimization Techniques",
+            slug=slugify("Database Optimization Techniques"),
+            excerpt="Tips for optimizing database queries and performance",
+            featured_image_url="https://placehold.co/800x400?text=Database&bg=336791&fg=FFFFFF",
+            read_time_minutes=12,
+            status="published",
+            content="Database performance is critical for application speed. Learn about indexing, query optimization, caching strategies, and database design patterns to improve your application's performance.",
+            author_id=users[0].id,
+            published_at=datetime.now()
+        ),
+        Article(
+            title="Introduction to Flask Framework",
+            slug=slugify("Introduction to Flask Framework"),
+            excerpt="Build lightweight web applications with Flask",
+            featured_image_url="https://placehold.co/800x400?text=Flask&bg=000000&fg=FFFFFF",
+            read_time_minutes=6,
+            status="published",
+            content="Flask is a lightweight web framework for Python that makes it easy to build web applications. This guide covers the basics of routing, request handling, templates, and database integration.",
+            author_id=users[1].id,
+            published_at=datetime.now()
+        ),
+    ]
+    for article in articles:
+        refresh_content_metadata(article, keep_excerpt=True)
+    db.session.add_all(articles)
+    db.session.flush()
+    
+    print("Linking articles with tags...")
+    # Link articles with tags
+    article_tags_map = [
+        (articles[0], [tags[0]]),  # Python
+        (articles[1], [tags[1], tags[2], tags[4]]),  # JavaScript, React, Frontend
+        (articles[2], [tags[3], tags[5]]),  # Backend, Web Development
+        (articles[3], [tags[1]]),  # JavaScript
+        (articles[4], [tags[3], tags[5]]),  # Backend, Web Development
+        (articles[5], [tags[0], tags[3], tags[5]]),  # Python, Backend, Web Development
+    ]
+    
+    for article, article_tags in article_tags_map:
+        for tag in article_tags:
+            article_tag = ArticleTag(article_id=article.id, tag_id=tag.id)
+            db.session.add(article_tag)
+    db.session.flush()
+
+    links = linked_tag_ids([article.id for article in articles])
+    for article in articles:
+        article.tag_ids = links[article.id]
+
+    # Tag.article_count is normally kept up to date by the article routes
+    recount_tags()
+    
+    db.session.commit()
+    print("✅ Database seeded successfully!")
+    print(f"Created {len(users)} users")
+    print(f"Created {len(tags)} tags")
+    print(f"Created {len(articles)} articles")
+
+    if search_enabled():
+        rebuild_search_index()
+    if related_enabled():
+        rebuild_related()
+
+# Word pool for generated titles and bodies, common enough that search and
+# tag filters return realistic result sizes
+VOCABULARY = (
+    "python javascript react backend frontend database index query cache latency "
+    "throughput server client request response deploy container cluster queue "
+    "worker thread process memory storage network protocol session token schema "
+    "migration testing review refactor design pattern service api endpoint json "
+    "stream batch pipeline metric trace log error retry timeout scaling replica "
+    "the a of to and in for with on is that this it as be by from we you can how"
+).split()
+TOPICS = VOCABULARY[:VOCABULARY.index("the")]
+
+
+def generated_body(rng):
+    # Log-normal around ~900 words with a long tail, like real posts
+    words = min(8000, max(80, int(rng.lognormvariate(6.8, 0.6))))
+    paragraphs = []
+    while words > 0:
+        size = min(words, rng.randint(40, 120))
+        paragraphs.append("<p>" + " ".join(rng.choices(VOCABULARY, k=size)) + ".</p>")
+        words -= size
+    return "\n".join(paragraphs)
+
+
+def insert_batches(model, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(model), rows[start:start + batch_size])
+
+
+# Generates a large dataset with executemany INSERTs in batches instead of
+# one ORM object per row. Deterministic for a given `seed`, every user has
+# the password "password123" (hashed once) and ids are assigned here so
+# article_tag rows can be built without reading anything back. Brings the
+# schema up to date first.
+def seed_bulk(users, articles, tags, seed=0, batch_size=1000, published_ratio=0.85):
+    rng = random.Random(seed)
+    now = utcnow().replace(microsecond=0)
+
+    upgrade()
+    RelatedArticle.query.delete()
+    ArticleViewCount.query.delete()
+    ArticleTag.query.delete()
+    Article.query.delete()
+    Tag.query.delete()
+    User.query.delete()
+
+    print(f"Creating {users} users...")
+    password_hash = hash_password("password123")
+    insert_batches(User, [
+        {
+            "id": i,
+            "email": f"user{i}@example.com",
+            "password_hash": password_hash,
+            "name": f"User {i}",
+            "role": "user",
+        }
+        for i in range(1, users + 1)
+    ], batch_size)
+
+    print(f"Creating {tags} tags...")
+    tag_titles = [f"{rng.choice(TOPICS).title()} {i}" for i in range(1, tags + 1)]
+    insert_batches(Tag, [
+        {"id": i, "title": title, "slug": slugify(title)}
+        for i, title in enumerate(tag_titles, start=1)
+    ], batch_size)
+
+    print(f"Creating {articles} articles...")
+    # Zipf-like tag popularity: a few tags are on many articles
+    tag_ids = list(range(1, tags + 1))
+    tag_weights = [1 / rank for rank in tag_ids]
+    for start in range(1, articles + 1, batch_size):
+        article_rows, link_rows = [], []
+        for i in range(start, min(start + batch_size, articles + 1)):
+            content = generated_body(rng)
+            text = plain_text(content)
+            word_count = len(text.split())
+            roll = rng.random()
+            if roll < published_ratio:
+                status, published_at = "published", now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60))
+            elif roll < published_ratio + (1 - published_ratio) / 2:
+                status, published_at = "draft", None
+            else:
+                status, published_at = "scheduled", now + timedelta(minutes=rng.randint(60, 30 * 24 * 60))
+            title = " ".join(rng.choices(VOCABULARY, k=rng.randint(3, 8))).capitalize()
+            article_rows.append({
+                "id": i,
+                "title": title,
+                "slug": f"{slugify(title)}-{i}",
+                "excerpt": make_excerpt(text),
+                "featured_image_url": f"https://placehold.co/800x400?text={i}",
+                "read_time_minutes": read_time(word_count),
+                "status": status,
+                "published_at": published_at,
+                "content": content,
+                "word_count": word_count,
+                "content_hash": content_hash(content),
+                "tag_ids": [],
+                "author_id": rng.randint(1, users),
+            })
+            if tags:
+                chosen = sorted(set(rng.choices(tag_ids, weights=tag_weights, k=rng.randint(1, 5))))
+                article_rows[-1]["tag_ids"] = chosen
+                link_rows.extend({"article_id": i, "tag_id": tag_id} for tag_id in chosen)
+        db.session.execute(insert(Article), article_rows)
+        if link_rows:
+            db.session.execute(insert(ArticleTag), link_rows)
+        print(f"  {min(start + batch_size - 1, articles)}/{articles}")
+
+    recount_tags()
+    db.session.commit()
+    print("✅ Bulk dataset created!")
+
+    if search_enabled():
+        print("Rebuilding search index...")
+        rebuild_search_index()
+    if related_enabled():
+        print("Rebuilding related articles...")
+        rebuild_related()
+
+
+def rebuild_search():
+    if not search_enabled():
+        print("Full-text search is only available on SQLite")
+        return
+    print("Rebuilding search index...")
+    indexed = rebuild_search_index()
+    print(f"✅ Indexed {indexed} articles")
 
 if __name__ == "__main__":
-    seed_database()
+    # python seed.py                - reset and seed the database
+    # python seed.py rebuild-search - rebuild the full-text search index
+    # python seed.py bulk --users 500 --articles 50000 --tags 300
+    #                               - reset and generate a large dataset
+    app = create_app()
+    app.app_context().push()
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-search":
+        rebuild_search()
+    elif len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        parser = argparse.ArgumentParser(prog="seed.py bulk", description="Generate a large dataset")
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--articles", type=int, default=10000)
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        args = parser.parse_args(sys.argv[2:])
+        seed_bulk(args.users, args.articles, args.tags, args.seed, args.batch_size)
+    else:
+        seed_database()
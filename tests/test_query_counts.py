@@ -0,0 +1,82 @@
+# Exact number of queries per request on the hot read paths, so an N+1 or
+# an extra validator or tag query fails here rather than in production.
+# Counts are read from the Server-Timing header added by utils/metrics.py,
+# against a small dataset generated with `seed.py bulk` in a temporary
+# SQLite database. The response cache is off (entries expire as soon as
+# they are stored); the per-process identity and tag caches are warmed by
+# one request first, like they are in a running worker.
+import os
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+PASSWORD = "password123"
+
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    from app import create_app
+    from seed import seed_bulk
+
+    database = tmp_path_factory.mktemp("query-counts") / "test.db"
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database}",
+        "CACHE_DEFAULT_TTL": 0,
+        "METRICS_ENABLED": True,
+        "SERVER_TIMING": True,
+        "SCHEDULER_ENABLED": False,
+        "VIEW_COUNTS_ENABLED": False,
+        "RELATED_ENABLED": False,
+    })
+    with app.app_context():
+        seed_bulk(users=5, articles=60, tags=10, seed=0)
+    yield app
+    with app.app_context():
+        from models import db
+        db.engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    client = app.test_client()
+    response = client.post("/auth/login", json={"email": "user1@example.com", "password": PASSWORD})
+    assert response.status_code == 200
+    return client
+
+
+@pytest.fixture(scope="module")
+def article_id(app):
+    from models import Article
+
+    with app.app_context():
+        return Article.query.filter_by(status="published").order_by(Article.id).first().id
+
+
+def queries(client, path):
+    client.get(path)
+    response = client.get(path)
+    assert response.status_code == 200
+    match = SERVER_TIMING_QUERIES.search(response.headers.get("Server-Timing", ""))
+    assert match, "Server-Timing header without a query count"
+    return int(match.group(1))
+
+
+# Validators, then the page with its authors and tags
+def test_articles_listing(client):
+    assert queries(client, "/articles") == 2
+
+
+# Validators, then the article with its author and tags
+def test_article_detail(client, article_id):
+    assert queries(client, f"/articles/{article_id}") == 2
+
+
+# One page of the logged-in author's own articles. A page the dated
+# articles do not fill also reads the undated ones, a second query.
+def test_own_articles(client):
+    assert queries(client, "/users/articles?limit=5") == 1
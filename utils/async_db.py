@@ -0,0 +1,119 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import Future
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from models import db
+from utils.db import set_sqlite_pragmas
+from utils.metrics import instrument_engine
+
+# Sync driver in DATABASE_URL -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+def async_database_url(database_url):
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS.values():
+        return url
+    if url.drivername not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for {url.drivername}, set ASYNC_DATABASE_URL")
+    # Every engine gets its own in-memory database, the async views would
+    # not see the app's tables
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        raise ValueError("Async views need an SQLite database file, not an in-memory one")
+    return url.set(drivername=ASYNC_DRIVERS[url.drivername])
+
+
+def _copy_outcome(future, task):
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+# One event loop per process on a daemon thread. Request threads hand their
+# coroutine over and wait for it, so while one request waits on the
+# database the loop carries on with the others, and the async engine's
+# pool lives on a single loop. Started on first use, and again in a forked
+# worker.
+class EventLoopThread:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                threading.Thread(target=self._loop.run_forever, name="async-views", daemon=True).start()
+            return self._loop
+
+    # The coroutine runs in a copy of the caller's context, so flask's app
+    # and request contexts are visible to it
+    def run(self, coro):
+        loop = self._get_loop()
+        future = Future()
+
+        def start():
+            task = loop.create_task(coro)
+            task.add_done_callback(functools.partial(_copy_outcome, future))
+
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return future.result()
+
+
+def get_async_session():
+    return current_app.extensions["async_session"]()
+
+
+# Asyncio engine on the app's database, same pool settings, pragmas and
+# query instrumentation as the sync one. Flask runs async views through
+# app.async_to_sync, which by default starts a new event loop per request;
+# here they all go to the shared loop instead.
+#
+# Only called with ASYNC_VIEWS on, the asyncio extension and its driver are
+# not even imported otherwise.
+def init_async_db(app):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    database_url = app.config.get("ASYNC_DATABASE_URL")
+    if not database_url:
+        # The sync engine's URL, relative SQLite paths already resolved
+        # against the instance folder by Flask-SQLAlchemy
+        with app.app_context():
+            database_url = db.engine.url
+    url = async_database_url(database_url)
+    engine = create_async_engine(url, **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragmas(app.config.get("SQLITE_PRAGMAS", {})))
+    if app.config.get("METRICS_ENABLED"):
+        instrument_engine(engine.sync_engine, app.config["SLOW_QUERY_MS"] / 1000)
+
+    loop_thread = EventLoopThread()
+    app.extensions["async_engine"] = engine
+    app.extensions["async_session"] = async_sessionmaker(engine, expire_on_commit=False)
+    app.extensions["async_loop"] = loop_thread
+
+    def async_to_sync(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            return loop_thread.run(func(*args, **kwargs))
+        return run
+
+    app.async_to_sync = async_to_sync
+    return engine
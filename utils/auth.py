@@ -1,9 +1,88 @@
-import bcrypt
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+
+# Raised when the password pool is saturated, callers answer with a 503
+class PasswordHasherBusy(Exception):
+    pass
+
+
+# bcrypt releases the GIL, so hashing on a small dedicated pool keeps a
+# burst of logins from occupying every request thread. The semaphore caps
+# how many jobs may wait on the pool, beyond that requests fail fast
+# instead of queueing up behind each other.
+_executor = None
+_slots = None
+_pool_lock = threading.Lock()
+_dummy_hashes = {}
+
+
+def _pool():
+    global _executor, _slots
+    if _executor is None:
+        with _pool_lock:
+            if _executor is None:
+                config = current_app.config
+                workers = config.get("PASSWORD_HASH_WORKERS", 2)
+                _slots = threading.BoundedSemaphore(workers + config.get("PASSWORD_HASH_MAX_PENDING", 16))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _executor, _slots
+
+
+def _run(fn, *args):
+    executor, slots = _pool()
+    if not slots.acquire(timeout=current_app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 2)):
+        raise PasswordHasherBusy()
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future.result()
+
+
+def _rounds():
+    return current_app.config.get("BCRYPT_ROUNDS", 12)
+
+
+# bcrypt is imported on first use, a worker that never sees a login or
+# registration never loads it
+def _hash(password, rounds):
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, hashed_password):
+    import bcrypt
+    return bcrypt.checkpw(password.encode(), hashed_password.encode())
+
 
 def hash_password(password):
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-    return hashed_password
+    return _run(_hash, password, _rounds())
+
 
 def verify_password(password, hashed_password):
-    return bcrypt.checkpw(password.encode(), hashed_password.encode())
+    return _run(_check, password, hashed_password)
+
+
+# True when the hash was made with a different cost than BCRYPT_ROUNDS,
+# e.g. "$2b$10$..." after the cost was raised to 12
+def password_needs_rehash(hashed_password):
+    try:
+        return int(hashed_password.split("$")[2]) != _rounds()
+    except (IndexError, ValueError):
+        return True
+
 
+# Burns the same time as a real check so a login for an unknown email
+# cannot be told apart from a wrong password by its response time
+def dummy_verify(password):
+    rounds = _rounds()
+    if rounds not in _dummy_hashes:
+        _dummy_hashes[rounds] = _run(_hash, secrets.token_hex(16), rounds)
+    verify_password(password, _dummy_hashes[rounds])
+    return False
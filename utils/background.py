@@ -0,0 +1,29 @@
+import atexit
+import os
+import threading
+
+
+# A daemon thread per process, started by the first request that needs it
+# rather than by create_app. CLI commands, seeding and other processes that
+# never serve such a request never start one, and with `gunicorn --preload`
+# every forked worker starts its own instead of relying on a thread that
+# only exists in the master. `at_exit` runs at interpreter exit in every
+# process that started the thread.
+class BackgroundThread:
+    def __init__(self, name, target, at_exit=None):
+        self.name = name
+        self._target = target
+        self._at_exit = at_exit
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._target, name=self.name, daemon=True).start()
+            if self._at_exit is not None:
+                atexit.register(self._at_exit)
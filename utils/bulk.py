@@ -0,0 +1,178 @@
+import json
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from models import Article, db
+from utils.content import refresh_content_metadata
+from utils.scheduler import SCHEDULED, apply_publish_at, parse_publish_at
+from utils.search import index_new_articles
+from utils.tags import PUBLISHED, link_new_articles, resolve_tags
+
+# Articles inserted per transaction by POST /articles/bulk
+IMPORT_BATCH_SIZE = 500
+
+REQUIRED_FIELDS = ("title", "slug", "featuredImageUrl", "status", "content")
+INSERT_COLUMNS = (
+    "title", "slug", "excerpt", "featured_image_url", "read_time_minutes", "status", "published_at",
+    "content", "word_count", "content_hash", "tag_ids", "author_id",
+)
+
+
+# One NDJSON line to Article keyword arguments plus tag names and publishAt.
+# Accepts the POST /articles field names as well as the snake_case ones
+# from /articles/export?format=ndjson, so an export can be imported again.
+def _parse_row(line):
+    try:
+        row = json.loads(line)
+    except ValueError:
+        raise ValueError("Invalid JSON")
+    if not isinstance(row, dict):
+        raise ValueError("Each line must be a JSON object")
+
+    if "featuredImageUrl" not in row and "featured_image_url" in row:
+        row["featuredImageUrl"] = row["featured_image_url"]
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    # Anything else would only fail in the batch INSERT, taking the rows
+    # around it down too
+    not_text = [
+        field for field in (*REQUIRED_FIELDS, "excerpt")
+        if row.get(field) is not None and not isinstance(row[field], str)
+    ]
+    if not_text:
+        raise ValueError(f"Fields must be strings: {', '.join(not_text)}")
+
+    publish_at = row.get("publishAt")
+    # An exported published_at only dates (or schedules) articles that were
+    # published or scheduled; drafts keep the date of an earlier
+    # publication, which must not publish them again
+    if not publish_at and row["status"] in (PUBLISHED, SCHEDULED):
+        publish_at = row.get("published_at")
+    try:
+        publish_at = parse_publish_at(publish_at) if publish_at else None
+    except (TypeError, ValueError):
+        raise ValueError("publishAt must be an ISO 8601 datetime")
+    if row["status"] == SCHEDULED and publish_at is None:
+        raise ValueError("publishAt is required for scheduled articles")
+
+    tags = []
+    if not isinstance(row.get("tags") or [], list):
+        raise ValueError("tags must be a list")
+    for tag in row.get("tags") or []:
+        if isinstance(tag, dict):
+            tag = tag.get("title")
+        if not isinstance(tag, str):
+            raise ValueError("tags must be names or objects with a title")
+        tags.append(tag)
+
+    fields = {
+        "title": row["title"],
+        "slug": row["slug"],
+        "excerpt": row.get("excerpt") or "",
+        "featured_image_url": row["featuredImageUrl"],
+        "status": row["status"],
+        "content": row["content"],
+    }
+    return fields, tags, publish_at
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.errors = []
+        self.statuses = set()
+        self.tag_slugs = set()
+        # Imported articles with tags, for the related-articles refresh
+        self.article_ids = []
+
+    def fail(self, line_number, error):
+        self.errors.append({"line": line_number, "error": error})
+
+    def as_dict(self):
+        return {"imported": self.imported, "failed": len(self.errors), "errors": self.errors}
+
+
+# Inserts one batch in one transaction: a single slug lookup, one shared
+# tag resolution, one executemany each for the articles, their tag links
+# and the search index
+def _import_batch(batch, author_id, result):
+    from slugify import slugify
+
+    slugs = [fields["slug"] for _, fields, _, _ in batch]
+    taken = {slug for (slug,) in db.session.query(Article.slug).filter(Article.slug.in_(slugs))}
+
+    rows = []
+    for line_number, fields, tag_names, publish_at in batch:
+        if fields["slug"] in taken:
+            result.fail(line_number, f"Slug '{fields['slug']}' already exists")
+            continue
+        taken.add(fields["slug"])
+        # Never added to the session, only used to derive the stored columns
+        article = Article(**fields, author_id=author_id, published_at=None)
+        apply_publish_at(article, publish_at)
+        refresh_content_metadata(article, keep_excerpt=bool(fields["excerpt"]))
+        rows.append((line_number, article, tag_names))
+    if not rows:
+        return
+
+    try:
+        tags = {tag.slug: tag for tag in resolve_tags(
+            [name for _, _, tag_names in rows for name in tag_names]
+        )}
+        article_tags = []
+        for _, article, tag_names in rows:
+            slugs = dict.fromkeys(slugify(name) for name in tag_names)
+            article_tags.append((article, [tags[slug] for slug in slugs if slug]))
+            article.tag_ids = [tag.id for tag in article_tags[-1][1]]
+
+        # Plain executemany: the ORM would fall back to one INSERT ... RETURNING
+        # per row on SQLite. Slugs are unique, so ids are read back by slug.
+        db.session.execute(insert(Article.__table__), [
+            {column: getattr(article, column) for column in INSERT_COLUMNS} for _, article, _ in rows
+        ])
+        ids = dict(db.session.execute(
+            select(Article.slug, Article.id).where(Article.slug.in_([article.slug for _, article, _ in rows]))
+        ).all())
+        for _, article, _ in rows:
+            article.id = ids[article.slug]
+
+        changed = link_new_articles(article_tags)
+        index_new_articles([(article, [tag.title for tag in tags]) for article, tags in article_tags])
+        db.session.commit()
+    except IntegrityError as e:
+        # Lost a race on a slug with a concurrent writer, the whole batch
+        # is rolled back and reported
+        db.session.rollback()
+        for line_number, _, _ in rows:
+            result.fail(line_number, f"Batch rolled back: {e.orig}")
+        return
+
+    result.imported += len(rows)
+    result.statuses.update(article.status for _, article, _ in rows)
+    result.tag_slugs |= changed
+    result.article_ids += [article.id for article, tags in article_tags if tags]
+
+
+# Imports NDJSON article lines for `author_id`, IMPORT_BATCH_SIZE rows per
+# transaction. Lines are read as they arrive, so the request body is never
+# held in memory; invalid lines are reported by line number and skipped.
+def import_articles(lines, author_id, batch_size=IMPORT_BATCH_SIZE):
+    result = ImportResult()
+    batch = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            fields, tag_names, publish_at = _parse_row(line)
+        except ValueError as e:
+            result.fail(line_number, str(e))
+            continue
+        batch.append((line_number, fields, tag_names, publish_at))
+        if len(batch) >= batch_size:
+            _import_batch(batch, author_id, result)
+            batch = []
+    if batch:
+        _import_batch(batch, author_id, result)
+    return result
@@ -0,0 +1,339 @@
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from flask import Response, current_app
+
+from utils.conditional import set_validators
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Default backend, a per-process LRU where every entry also expires after
+# `ttl` seconds. Entries can carry tags so writes can drop exactly the
+# entries they affect instead of flushing everything.
+class LRUCache:
+    name = "memory"
+
+    def __init__(self, max_entries=2048, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set of keys
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def set(self, key, value, tags=(), ttl=None):
+        expires_at = time.monotonic() + (ttl or self.ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self.stats.sets += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tags(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+                    self.stats.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Caller must hold the lock
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+# Cache shared between processes/hosts. It only needs the small subset of
+# the redis-py client API used below, so it runs against a real Redis when
+# the `redis` package and CACHE_REDIS_URL are available, and against
+# LocalRedis otherwise.
+class SharedCache:
+    name = "shared"
+
+    def __init__(self, client, ttl=60, prefix="blog:cache:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return pickle.loads(raw)
+
+    def set(self, key, value, tags=(), ttl=None):
+        ttl = ttl or self.ttl
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            self.client.sadd(tag_key, key)
+            # The tag set must outlive every entry it points to
+            self.client.expire(tag_key, ttl * 2)
+        self.stats.incr("sets")
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def invalidate_tags(self, *tags):
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = [self.prefix + k.decode() if isinstance(k, bytes) else self.prefix + k
+                    for k in self.client.smembers(tag_key)]
+            self.client.delete(tag_key, *keys)
+            self.stats.incr("invalidations", len(keys))
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+# In-memory stand-in for a Redis client, used for the shared backend in
+# development and tests when no Redis server is configured
+class LocalRedis:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}  # key -> (expires_at or None, value)
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[1] if entry else None
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else None, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def sadd(self, key, *members):
+        with self._lock:
+            entry = self._live(key)
+            values = entry[1] if entry else set()
+            values.update(members)
+            self._data[key] = (entry[0] if entry else None, values)
+
+    def smembers(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return set(entry[1]) if entry else set()
+
+    def expire(self, key, seconds):
+        with self._lock:
+            entry = self._live(key)
+            if entry:
+                self._data[key] = (time.monotonic() + seconds, entry[1])
+
+    def scan_iter(self, match="*"):
+        prefix = match.rstrip("*")
+        with self._lock:
+            return [key for key in self._data if key.startswith(prefix)]
+
+
+def _make_shared_client(app):
+    url = app.config.get("CACHE_REDIS_URL")
+    if url:
+        try:
+            import redis
+            return redis.Redis.from_url(url)
+        except ImportError:
+            logger.warning("CACHE_REDIS_URL is set but the redis package is not installed, using a local stand-in")
+    return LocalRedis()
+
+
+def init_cache(app):
+    app.config.setdefault("CACHE_BACKEND", "memory")
+    app.config.setdefault("CACHE_DEFAULT_TTL", 60)
+    app.config.setdefault("CACHE_MAX_ENTRIES", 2048)
+
+    backend = app.config["CACHE_BACKEND"]
+    ttl = app.config["CACHE_DEFAULT_TTL"]
+    if backend == "memory":
+        cache = LRUCache(max_entries=app.config["CACHE_MAX_ENTRIES"], ttl=ttl)
+    elif backend == "shared":
+        cache = SharedCache(_make_shared_client(app), ttl=ttl)
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+    app.extensions["response_cache"] = cache
+
+    # Bounded slug -> article id map for /articles/by-slug, always local
+    app.config.setdefault("SLUG_CACHE_MAX_ENTRIES", 10000)
+    app.config.setdefault("SLUG_CACHE_TTL", 300)
+    app.extensions["slug_cache"] = LRUCache(
+        max_entries=app.config["SLUG_CACHE_MAX_ENTRIES"],
+        ttl=app.config["SLUG_CACHE_TTL"],
+    )
+
+    # Tag id -> {id, title, slug} for rendering Article.tag_ids. Tags are
+    # never renamed, the TTL only covers changes made outside the app.
+    app.config.setdefault("TAG_CACHE_MAX_ENTRIES", 50000)
+    app.config.setdefault("TAG_CACHE_TTL", 3600)
+    app.extensions["tag_cache"] = LRUCache(
+        max_entries=app.config["TAG_CACHE_MAX_ENTRIES"],
+        ttl=app.config["TAG_CACHE_TTL"],
+    )
+    return cache
+
+
+def get_cache():
+    return current_app.extensions["response_cache"]
+
+
+def get_slug_cache():
+    return current_app.extensions["slug_cache"]
+
+
+def get_tag_cache():
+    return current_app.extensions["tag_cache"]
+
+
+# Cache key is the endpoint plus its query args in a stable order, so
+# ?a=1&b=2 and ?b=2&a=1 share an entry
+def cache_key(endpoint, args=None, **view_args):
+    parts = sorted(args.items(multi=True)) if args is not None else []
+    parts += sorted(view_args.items())
+    return f"{endpoint}?{urlencode(parts)}"
+
+
+# Entries keep the response validators next to the body, so a hit can
+# still answer conditional requests without touching the database
+def cached_response(key):
+    return cached_response_with(key)[0]
+
+
+# (response, extra) of an entry stored with cache_response(..., extra=...),
+# (None, None) on a miss. `extra` lets a caller check a field of the cached
+# payload without parsing the body.
+def cached_response_with(key):
+    entry = get_cache().get(key)
+    if entry is None:
+        return None, None
+    # Entries written before `extra` existed can still be in a shared cache
+    body, etag, last_modified, *extra = entry
+    response = Response(body, mimetype="application/json")
+    if etag:
+        set_validators(response, etag, last_modified)
+    return response, extra[0] if extra else None
+
+
+def cache_response(key, response, tags, extra=None):
+    if response.status_code == 200:
+        etag, _ = response.get_etag()
+        get_cache().set(key, (response.get_data(), etag, response.last_modified, extra), tags=tags)
+    return response
+
+
+# Cache tags used by the article endpoints. A listing entry is tagged with
+# its status filter plus every article, author and tag it shows, so a write
+# only has to drop the entries that could actually contain it.
+def article_cache_tag(article_id):
+    return f"article:{article_id}"
+
+
+def author_cache_tag(author_id):
+    return f"author:{author_id}"
+
+
+def related_cache_tag(article_id):
+    return f"related:{article_id}"
+
+
+def listing_cache_tag(status):
+    return f"articles:status:{status or '*'}"
+
+
+def tag_cache_tag(tag_slug):
+    return f"tag:{tag_slug}"
+
+
+TAG_LIST_CACHE_TAG = "tags"
+
+
+def invalidate_articles(article_ids=(), statuses=(), tag_slugs=(), author_ids=()):
+    tags = [article_cache_tag(article_id) for article_id in article_ids]
+    # The unfiltered listing (?status=) contains every status
+    tags += [listing_cache_tag(status) for status in set(statuses) | {""}] if statuses else []
+    tags += [tag_cache_tag(slug) for slug in tag_slugs]
+    tags += [author_cache_tag(author_id) for author_id in author_ids]
+    # Per-tag article counts move with tag links and status changes
+    if statuses or tag_slugs:
+        tags.append(TAG_LIST_CACHE_TAG)
+    get_cache().invalidate_tags(*tags)
@@ -0,0 +1,33 @@
+import hashlib
+from datetime import timezone
+
+from flask import Response, request
+from werkzeug.http import is_resource_modified
+
+
+# Strong ETag from whatever identifies a version of the resource
+def make_etag(*parts):
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:40]
+
+
+# Most recent of the given naive UTC datetimes, as an aware datetime
+def last_modified_of(*values):
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return max(values).replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+# Returns a 304 when the client's If-None-Match / If-Modified-Since still
+# match, so the caller can skip building the payload altogether
+def not_modified_response(etag, last_modified):
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return set_validators(Response(status=304), etag, last_modified)
@@ -0,0 +1,63 @@
+import hashlib
+import html
+import math
+import re
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 200
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+_MD_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_MARKUP = re.compile(r"(^|\s)#{1,6}\s|[*_`>~]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+# Article bodies are HTML or Markdown from the editor, this reduces them to
+# the words a reader actually sees
+def plain_text(content):
+    text = _HTML_TAG.sub(" ", content or "")
+    text = html.unescape(text)
+    text = _MD_IMAGE.sub(r"\1", text)
+    text = _MD_LINK.sub(r"\1", text)
+    text = _MD_MARKUP.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def content_hash(content):
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+def read_time(word_count):
+    return max(1, math.ceil(word_count / WORDS_PER_MINUTE))
+
+
+# First EXCERPT_LENGTH characters, cut back to a word boundary
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0]
+    return cut.rstrip(".,;:!?-") + "..."
+
+
+# True when `excerpt` is what we would have generated for `content`, i.e.
+# the author never wrote a custom one
+def is_generated_excerpt(excerpt, content):
+    return excerpt == make_excerpt(plain_text(content))
+
+
+# Derives word count, read time and (unless the author supplied one) the
+# excerpt from the article body. Does nothing when the body hash is
+# unchanged, so edits that do not touch the content cost no text work.
+def refresh_content_metadata(article, keep_excerpt):
+    digest = content_hash(article.content)
+    if digest == article.content_hash:
+        return False
+
+    text = plain_text(article.content)
+    article.word_count = len(text.split())
+    article.read_time_minutes = read_time(article.word_count)
+    article.content_hash = digest
+    if not keep_excerpt:
+        article.excerpt = make_excerpt(text)
+    return True
@@ -0,0 +1,23 @@
+from sqlalchemy import event
+
+from models import db
+
+
+# Only listened for on SQLite engines. Works on sqlite3 connections and on
+# the aiosqlite adapter of the async engine alike.
+def set_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
+
+# Binds flask-sqlalchemy to the app and tunes every new SQLite connection
+def init_db(app):
+    db.init_app(app)
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", set_sqlite_pragmas(app.config.get("SQLITE_PRAGMAS", {})))
@@ -0,0 +1,52 @@
+from collections import namedtuple
+
+from flask import current_app, jsonify
+
+from models import User, db
+from utils.cache import LRUCache
+
+# Immutable snapshot of the columns routes need about the logged-in user.
+# Cached across requests instead of ORM instances, which belong to a session.
+CurrentUser = namedtuple("CurrentUser", "id email name avatar role created_at")
+
+
+def get_identity_cache():
+    return current_app.extensions["identity_cache"]
+
+
+def load_identity(user_id):
+    cache = get_identity_cache()
+    identity = cache.get(user_id)
+    if identity is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        identity = CurrentUser(user.id, user.email, user.name, user.avatar, user.role, user.created_at)
+        cache.set(user_id, identity)
+    return identity
+
+
+# Drops this process's entry. Other workers keep theirs for at most
+# IDENTITY_CACHE_TTL seconds.
+def invalidate_identity(user_id):
+    get_identity_cache().delete(user_id)
+
+
+# Resolves the JWT subject through the cache, so `current_user` costs no
+# query on authenticated routes while the entry is fresh
+def init_identity(app, jwt):
+    app.config.setdefault("IDENTITY_CACHE_TTL", 30)
+    app.config.setdefault("IDENTITY_CACHE_MAX_ENTRIES", 10000)
+    app.extensions["identity_cache"] = LRUCache(
+        max_entries=app.config["IDENTITY_CACHE_MAX_ENTRIES"],
+        ttl=app.config["IDENTITY_CACHE_TTL"],
+    )
+
+    @jwt.user_lookup_loader
+    def user_lookup(jwt_header, jwt_data):
+        return load_identity(int(jwt_data[app.config["JWT_IDENTITY_CLAIM"]]))
+
+    # A valid token for a deleted user
+    @jwt.user_lookup_error_loader
+    def user_lookup_error(jwt_header, jwt_data):
+        return jsonify({"error": "User not found"}), 404
@@ -0,0 +1,204 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from models import db
+
+slow_query_logger = logging.getLogger("slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_SKIP_FRAMES = (os.sep + "sqlalchemy" + os.sep, os.sep + "flask_sqlalchemy" + os.sep, __file__)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+# Per-process registry, every gunicorn worker exposes its own numbers and
+# Prometheus sums them up. Hooks only touch it once per request, under the
+# lock; per-query bookkeeping lives on flask.g.
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.db_seconds = defaultdict(float)
+        self.serialize_seconds = defaultdict(float)
+        self.slow_queries = 0
+
+    def record(self, endpoint, method, status, latency, queries, db_time, serialize_time):
+        with self.lock:
+            self.requests[(endpoint, method, status)] += 1
+            self.latency[endpoint].observe(latency)
+            self.queries[endpoint].observe(queries)
+            self.db_seconds[endpoint] += db_time
+            self.serialize_seconds[endpoint] += serialize_time
+
+    # Prometheus text exposition format
+    def render(self):
+        lines = []
+        with self.lock:
+            lines.append("# HELP http_requests_total Requests handled, by endpoint, method and status.")
+            lines.append("# TYPE http_requests_total counter")
+            for (endpoint, method, status), value in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}'
+                )
+            _render_histograms(
+                lines, "http_request_duration_seconds", "Request latency in seconds.", self.latency
+            )
+            _render_histograms(
+                lines, "db_queries_per_request", "SQL statements executed per request.", self.queries
+            )
+            _render_counters(
+                lines, "db_seconds_total", "Time spent executing SQL statements.", self.db_seconds
+            )
+            _render_counters(
+                lines, "serialize_seconds_total", "Time spent serializing responses.", self.serialize_seconds
+            )
+            lines.append("# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.")
+            lines.append("# TYPE db_slow_queries_total counter")
+            lines.append(f"db_slow_queries_total {self.slow_queries}")
+        return "\n".join(lines) + "\n"
+
+
+def _render_histograms(lines, name, help_text, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for endpoint, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+
+def _render_counters(lines, name, help_text, values):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for endpoint, value in sorted(values.items()):
+        lines.append(f'{name}{{endpoint="{endpoint}"}} {value:.6f}')
+
+
+metrics = Metrics()
+
+
+def get_metrics():
+    return metrics
+
+
+# Adds the time spent in the block to the current request's serialize time
+@contextmanager
+def timed_serialization():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context():
+            g.serialize_time = g.get("serialize_time", 0.0) + time.perf_counter() - start
+
+
+# First frame outside SQLAlchemy and this module, i.e. the line that ran the query
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in _SKIP_FRAMES):
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+# Also used for the asyncio engine of the async views, through its sync_engine
+def instrument_engine(engine, slow_query_seconds):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        if has_request_context():
+            g.db_queries = g.get("db_queries", 0) + 1
+            g.db_time = g.get("db_time", 0.0) + elapsed
+        if slow_query_seconds and elapsed >= slow_query_seconds:
+            with metrics.lock:
+                metrics.slow_queries += 1
+            slow_query_logger.warning(
+                "%.1f ms at %s: %s", elapsed * 1000, _call_site(), " ".join(statement.split())
+            )
+
+
+# METRICS_ENABLED: request/query instrumentation and /metrics
+# SERVER_TIMING:   per-request db/serialize/app timings as a response header
+# SLOW_QUERY_MS:   log statements slower than this with their call site, 0 is off
+def init_metrics(app):
+    app.config.setdefault("METRICS_ENABLED", True)
+    app.config.setdefault("SERVER_TIMING", True)
+    app.config.setdefault("SLOW_QUERY_MS", 0)
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    with app.app_context():
+        instrument_engine(db.engine, app.config["SLOW_QUERY_MS"] / 1000)
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def server_timing(response):
+        if app.config["SERVER_TIMING"] and "request_start" in g:
+            total = time.perf_counter() - g.request_start
+            response.headers["Server-Timing"] = (
+                f'db;dur={g.get("db_time", 0.0) * 1000:.2f};desc="{g.get("db_queries", 0)} queries", '
+                f'serialize;dur={g.get("serialize_time", 0.0) * 1000:.2f}, '
+                f"app;dur={total * 1000:.2f}"
+            )
+        g.response_status = response.status_code
+        g.response_streamed = response.is_streamed
+        return response
+
+    # A stream_with_context response tears the request down twice, once
+    # when the view returns and again when the body is exhausted. Only the
+    # second one is recorded, so exports count their full duration and
+    # every query they ran.
+    @app.teardown_request
+    def record_request(exc):
+        if "request_start" not in g:
+            return
+        if g.pop("response_streamed", False):
+            return
+        metrics.record(
+            request.endpoint or "unmatched",
+            request.method,
+            500 if exc is not None else g.get("response_status", 500),
+            time.perf_counter() - g.request_start,
+            g.get("db_queries", 0),
+            g.get("db_time", 0.0),
+            g.get("serialize_time", 0.0),
+        )
@@ -0,0 +1,102 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import or_
+
+from models import Article
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(article):
+    published_at = article.published_at.isoformat() if article.published_at else None
+    raw = json.dumps([published_at, article.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published_at, article_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if published_at is not None:
+            published_at = datetime.fromisoformat(published_at)
+        return published_at, int(article_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+# Reads ?limit= and ?cursor= from the request, raises ValueError on bad input
+def get_page_args():
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or limit < 1:
+        raise ValueError("limit must be a positive integer")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = request.args.get("cursor")
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+# Keyset pagination over (published_at DESC, id DESC).
+# Instead of OFFSET, every page starts right after the last row of the
+# previous one, so the database seeks straight into the index and deep pages
+# cost the same as the first. NULL published_at (drafts) sort last, which is
+# how both SQLite and MySQL order NULLs in a DESC sort. They are fetched as a
+# separate seek once the dated rows run out, an OR over both groups would
+# stop the index from being used as a range.
+#
+# `query` is a legacy Query or, for the async views, a select() run by
+# paginate_articles_async; both build their seeks with the helpers below.
+def paginate_articles(query, limit, cursor=None):
+    # Fetch one extra row to know whether there is a next page
+    rows = []
+    dated = _dated_seek(query, limit, cursor)
+    if dated is not None:
+        rows = dated.all()
+
+    if len(rows) <= limit:
+        rows += _undated_seek(query, limit - len(rows), cursor).all()
+    return _page_of(rows, limit)
+
+
+async def paginate_articles_async(session, statement, limit, cursor=None):
+    rows = []
+    dated = _dated_seek(statement, limit, cursor)
+    if dated is not None:
+        rows = list((await session.scalars(dated)).all())
+
+    if len(rows) <= limit:
+        rows += (await session.scalars(_undated_seek(statement, limit - len(rows), cursor))).all()
+    return _page_of(rows, limit)
+
+
+_ORDER = (Article.published_at.desc(), Article.id.desc())
+
+
+# None once the cursor is already past the dated rows
+def _dated_seek(query, limit, cursor):
+    published_at, article_id = cursor if cursor else (None, None)
+    if cursor and published_at is None:
+        return None
+    dated = query.filter(Article.published_at.is_not(None))
+    if cursor:
+        dated = dated.filter(
+            Article.published_at <= published_at,
+            or_(Article.published_at < published_at, Article.id < article_id),
+        )
+    return dated.order_by(*_ORDER).limit(limit + 1)
+
+
+def _undated_seek(query, remaining, cursor):
+    published_at, article_id = cursor if cursor else (None, None)
+    undated = query.filter(Article.published_at.is_(None))
+    if published_at is None and article_id is not None:
+        undated = undated.filter(Article.id < article_id)
+    return undated.order_by(*_ORDER).limit(remaining + 1)
+
+
+def _page_of(rows, limit):
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
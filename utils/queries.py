@@ -0,0 +1,88 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, load_only, raiseload
+
+from models import Article, User, db
+from utils.conditional import last_modified_of, make_etag
+
+# Columns needed to render an article card. `content` is deliberately left
+# out, it is by far the biggest column and only the detail view needs it.
+ARTICLE_SUMMARY_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.slug,
+    Article.excerpt,
+    Article.featured_image_url,
+    Article.read_time_minutes,
+    Article.word_count,
+    Article.status,
+    Article.published_at,
+    Article.tag_ids,
+    Article.author_id,
+)
+
+
+# Author is a many-to-one so it rides along in the main query. Tags come
+# from the denormalized Article.tag_ids and the tag cache, never from
+# article_tag. Anything else stays unloaded and raises instead of silently
+# doing N+1.
+def _related_options():
+    return (
+        joinedload(Article.author).load_only(User.id, User.name, User.email, User.avatar),
+        raiseload("*"),
+    )
+
+
+# Listing projection, touching a deferred column such as `content` raises
+def article_summary_options(with_related=True):
+    options = (load_only(*ARTICLE_SUMMARY_COLUMNS, raiseload=True),)
+    if with_related:
+        return options + _related_options()
+    return options + (raiseload("*"),)
+
+
+def article_detail_options():
+    return _related_options()
+
+
+# Validators for a listing come from one MAX/COUNT query over the indexes
+# instead of the rows themselves. MAX(updated_at) is taken over every
+# article, so Last-Modified also advances when one leaves the status (a
+# write bumps it wherever it ends up); COUNT of the status is kept in the
+# ETag. The users MAX catches author name/avatar changes.
+def listing_validators_query(status):
+    articles_updated_at = select(func.max(Article.updated_at)).scalar_subquery()
+    authors_updated_at = select(func.max(User.updated_at)).scalar_subquery()
+    query = select(articles_updated_at, func.count(Article.id), authors_updated_at)
+    if status:
+        query = query.where(Article.status == status)
+    return query
+
+
+def listing_validators_of(key, row):
+    articles_updated_at, count, authors_updated_at = row
+    etag = make_etag(key, articles_updated_at, count, authors_updated_at)
+    return etag, last_modified_of(articles_updated_at, authors_updated_at)
+
+
+def listing_validators(status, key):
+    return listing_validators_of(key, db.session.execute(listing_validators_query(status)).one())
+
+
+def article_validators_query(article_id):
+    return (
+        select(Article.updated_at, User.updated_at)
+        .join(User, Article.author_id == User.id)
+        .where(Article.id == article_id)
+        .limit(1)
+    )
+
+
+# Returns (None, None) when the article does not exist
+def article_validators_of(article_id, row):
+    if row is None:
+        return None, None
+    return make_etag("article", article_id, *row), last_modified_of(*row)
+
+
+def article_validators(article_id):
+    return article_validators_of(article_id, db.session.execute(article_validators_query(article_id)).first())
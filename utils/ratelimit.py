@@ -0,0 +1,53 @@
+import math
+import threading
+import time
+
+from flask import current_app
+
+
+# Per-process fixed window counter. Good enough to stop one client from
+# hammering login, not meant as an exact quota across workers.
+class RateLimiter:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters = {}  # key -> (window_start, count)
+
+    # Returns the seconds to wait if `key` is over the limit, otherwise None
+    def blocked_for(self, key):
+        now = time.monotonic()
+        with self._lock:
+            start, count = self._counters.get(key, (now, 0))
+            if now - start >= self.window or count < self.limit:
+                return None
+            return max(1, math.ceil(self.window - (now - start)))
+
+    def hit(self, key):
+        now = time.monotonic()
+        with self._lock:
+            start, count = self._counters.get(key, (now, 0))
+            if now - start >= self.window:
+                start, count = now, 0
+            self._counters[key] = (start, count + 1)
+            if len(self._counters) > 10000:
+                self._sweep(now)
+
+    def reset(self, key):
+        with self._lock:
+            self._counters.pop(key, None)
+
+    # Caller must hold the lock
+    def _sweep(self, now):
+        expired = [key for key, (start, _) in self._counters.items() if now - start >= self.window]
+        for key in expired:
+            del self._counters[key]
+
+
+# Limits are configured as "<count>/<seconds>", e.g. "5/300"
+def get_limiter(name):
+    limiters = current_app.extensions.setdefault("rate_limiters", {})
+    if name not in limiters:
+        limit, window = current_app.config[name].split("/")
+        limiters[name] = RateLimiter(int(limit), float(window))
+    return limiters[name]
@@ -0,0 +1,316 @@
+import heapq
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from operator import itemgetter
+
+from flask import current_app
+from sqlalchemy import and_, bindparam, delete, func, insert, or_, select
+
+from models import Article, ArticleTag, RelatedArticle, Tag, db, utcnow
+from utils.background import BackgroundThread
+from utils.cache import get_cache, related_cache_tag
+from utils.tags import PUBLISHED
+
+logger = logging.getLogger(__name__)
+
+# Most recent published articles per tag considered as candidates. Caps
+# the work for tags carried by a large part of the site.
+MAX_POSTINGS = 1000
+# An article is offered to the lists of this many of its best matches when
+# its tags change, the rest pick it up on the next full rebuild
+REVERSE_CANDIDATES = 100
+
+
+# Rare tags say more about an article than ones on half the site
+def _weight(article_count):
+    return 1 / math.log(2 + article_count)
+
+
+def _decay(published_at, now, half_life):
+    if not half_life or published_at is None:
+        return 1.0
+    age = max((now - published_at).total_seconds(), 0)
+    return 0.5 ** (age / half_life)
+
+
+# Published articles reachable through `tag_ids` (all of them for None):
+# per tag the MAX_POSTINGS most recent ones, with their full tag sets, plus
+# a weight per tag
+class _Corpus:
+    def __init__(self, tag_ids=None):
+        position = func.row_number().over(
+            partition_by=ArticleTag.tag_id, order_by=(Article.published_at.desc(), Article.id.desc())
+        )
+        ranked = (
+            select(ArticleTag.tag_id, Article.id, Article.tag_ids, Article.published_at, position.label("position"))
+            .join(Article, ArticleTag.article_id == Article.id)
+            .where(Article.status == PUBLISHED)
+        )
+        if tag_ids is not None:
+            ranked = ranked.where(ArticleTag.tag_id.in_(tag_ids))
+        ranked = ranked.subquery()
+
+        self.postings = defaultdict(list)
+        self.tags = {}
+        self.published_at = {}
+        rows = db.session.execute(
+            select(ranked.c.tag_id, ranked.c.id, ranked.c.tag_ids, ranked.c.published_at)
+            .where(ranked.c.position <= MAX_POSTINGS)
+        )
+        for tag_id, article_id, article_tag_ids, published_at in rows:
+            self.postings[tag_id].append(article_id)
+            self.tags[article_id] = frozenset(article_tag_ids or ())
+            self.published_at[article_id] = published_at
+
+        weights = select(Tag.id, Tag.article_count)
+        if tag_ids is not None:
+            weights = weights.where(Tag.id.in_(set(tag_ids).union(*self.tags.values())))
+        self.weights = {tag_id: _weight(count) for tag_id, count in db.session.execute(weights)}
+        self.totals = {article_id: self.total(tags) for article_id, tags in self.tags.items()}
+
+    def total(self, tag_ids):
+        default = _weight(0)
+        return sum(self.weights.get(tag_id, default) for tag_id in tag_ids)
+
+    # Weighted Jaccard similarity of `tag_ids` with every candidate sharing
+    # at least one of them, {candidate id: similarity}
+    def similar(self, article_id, tag_ids):
+        default = _weight(0)
+        own = self.total(tag_ids)
+        # Summing the weights of the shared tags while walking the postings
+        # leaves only one division per candidate
+        shared = defaultdict(float)
+        for tag_id in frozenset(tag_ids):
+            weight = self.weights.get(tag_id, default)
+            for candidate in self.postings.get(tag_id, ()):
+                shared[candidate] += weight
+        shared.pop(article_id, None)
+        totals = self.totals
+        return {
+            candidate: overlap / (own + totals[candidate] - overlap) for candidate, overlap in shared.items()
+        }
+
+
+def _half_life():
+    return current_app.config["RELATED_HALF_LIFE_DAYS"] * 86400
+
+
+# Top RELATED_SIZE of `similarities`, each decayed by the candidate's age
+def _top(corpus, similarities, now):
+    half_life = _half_life()
+    scores = (
+        (candidate, similarity * _decay(corpus.published_at[candidate], now, half_life))
+        for candidate, similarity in similarities.items()
+    )
+    return heapq.nlargest(current_app.config["RELATED_SIZE"], scores, key=itemgetter(1))
+
+
+def _insert_rows(rows):
+    if rows:
+        db.session.execute(insert(RelatedArticle.__table__), rows)
+
+
+# Recomputes the lists of `article_ids` and offers each published one to
+# the lists of its best matches, in the caller's transaction. Lists it
+# drops out of are one entry short until the next full rebuild. Returns
+# the ids of the lists that changed.
+def refresh_related(article_ids):
+    sources = db.session.execute(
+        select(Article.id, Article.tag_ids, Article.status, Article.published_at)
+        .where(Article.id.in_(article_ids))
+    ).all()
+    ids = {source.id for source in sources}
+    if not ids:
+        return set()
+    corpus = _Corpus({tag_id for source in sources for tag_id in source.tag_ids or ()})
+    now = utcnow()
+    half_life = _half_life()
+    size = current_app.config["RELATED_SIZE"]
+
+    rows = []
+    offers = defaultdict(dict)  # candidate -> {source id: score in the candidate's list}
+    for source in sources:
+        similarities = corpus.similar(source.id, source.tag_ids or ())
+        rows += [
+            {"article_id": source.id, "related_id": related_id, "score": score}
+            for related_id, score in _top(corpus, similarities, now)
+        ]
+        if source.status != PUBLISHED:
+            continue
+        decay = _decay(source.published_at, now, half_life)
+        for candidate, similarity in heapq.nlargest(REVERSE_CANDIDATES, similarities.items(), key=itemgetter(1)):
+            if candidate not in ids:
+                offers[candidate][source.id] = similarity * decay
+
+    changed = set(ids)
+    changed.update(db.session.scalars(
+        select(RelatedArticle.article_id).where(RelatedArticle.related_id.in_(ids))
+    ))
+    db.session.execute(
+        delete(RelatedArticle).where(or_(RelatedArticle.article_id.in_(ids), RelatedArticle.related_id.in_(ids)))
+    )
+    _insert_rows(rows)
+    if not offers:
+        return changed
+
+    current = defaultdict(dict)
+    rows = db.session.execute(
+        select(RelatedArticle.article_id, RelatedArticle.related_id, RelatedArticle.score)
+        .where(RelatedArticle.article_id.in_(offers))
+    )
+    for article_id, related_id, score in rows:
+        current[article_id][related_id] = score
+
+    added, removed = [], []
+    for candidate, offered in offers.items():
+        kept = dict(heapq.nlargest(size, {**current[candidate], **offered}.items(), key=itemgetter(1)))
+        entering = [
+            {"article_id": candidate, "related_id": source_id, "score": score}
+            for source_id, score in offered.items() if source_id in kept
+        ]
+        if entering:
+            added += entering
+            removed += [
+                {"list_id": candidate, "entry_id": related_id}
+                for related_id in current[candidate] if related_id not in kept
+            ]
+            changed.add(candidate)
+
+    if removed:
+        table = RelatedArticle.__table__
+        db.session.execute(
+            delete(table).where(and_(
+                table.c.article_id == bindparam("list_id"), table.c.related_id == bindparam("entry_id"),
+            )),
+            removed,
+        )
+    _insert_rows(added)
+    return changed
+
+
+# refresh_related in its own transaction, then drops the cached responses
+# of every list that changed
+def refresh_related_now(article_ids):
+    try:
+        changed = refresh_related(article_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if changed:
+        get_cache().invalidate_tags(*map(related_cache_tag, changed))
+    return changed
+
+
+# Rebuilds every list from scratch, `batch_size` articles per transaction,
+# with the candidates loaded once for the whole run. Returns the number of
+# articles processed.
+def rebuild_related(batch_size=500):
+    corpus = _Corpus()
+    now = utcnow()
+    last_id = total = 0
+    while True:
+        sources = db.session.execute(
+            select(Article.id, Article.tag_ids).where(Article.id > last_id).order_by(Article.id).limit(batch_size)
+        ).all()
+        if not sources:
+            break
+
+        ids = [source.id for source in sources]
+        rows = []
+        for source in sources:
+            similarities = corpus.similar(source.id, source.tag_ids or ())
+            rows += [
+                {"article_id": source.id, "related_id": related_id, "score": score}
+                for related_id, score in _top(corpus, similarities, now)
+            ]
+        db.session.execute(delete(RelatedArticle).where(RelatedArticle.article_id.in_(ids)))
+        _insert_rows(rows)
+        db.session.commit()
+        get_cache().invalidate_tags(*map(related_cache_tag, ids))
+
+        total += len(ids)
+        last_id = ids[-1]
+    return total
+
+
+# Articles whose tags changed since the last refresh. Writes only add ids
+# here; the background thread does the refresh, so create and edit pay
+# nothing for the index.
+class RelatedQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.ready = threading.Event()
+
+    def add(self, article_ids):
+        with self._lock:
+            self._pending.update(article_ids)
+        self.ready.set()
+
+    # Caller needs an app context. Ids are put back if the refresh fails.
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        self.ready.clear()
+        if not pending:
+            return set()
+        try:
+            return refresh_related_now(pending)
+        except Exception:
+            self.add(pending)
+            raise
+
+
+def related_enabled():
+    return "related_queue" in current_app.extensions
+
+
+def mark_related(article_ids):
+    queue = current_app.extensions.get("related_queue")
+    if queue is not None and article_ids:
+        queue.add(article_ids)
+        current_app.extensions["related_thread"].ensure_started()
+
+
+# RELATED_ENABLED: maintain the index and serve /articles/<id>/related
+# RELATED_REFRESH_INTERVAL: seconds a change waits, so bursts of writes
+# are refreshed together
+#
+# One background thread per process refreshes what that process marked,
+# started by its first mark.
+# Marks still pending at exit are refreshed then; a killed worker leaves
+# them for the next `flask rebuild-related`.
+def init_related(app):
+    app.config.setdefault("RELATED_ENABLED", True)
+    app.config.setdefault("RELATED_SIZE", 10)
+    app.config.setdefault("RELATED_HALF_LIFE_DAYS", 180)
+    app.config.setdefault("RELATED_REFRESH_INTERVAL", 5)
+    if not app.config["RELATED_ENABLED"]:
+        return
+
+    queue = RelatedQueue()
+    app.extensions["related_queue"] = queue
+    interval = app.config["RELATED_REFRESH_INTERVAL"]
+
+    def run():
+        while True:
+            queue.ready.wait()
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    queue.flush()
+            except Exception:
+                logger.exception("Refreshing related articles failed")
+
+    def flush_at_exit():
+        try:
+            with app.app_context():
+                queue.flush()
+        except Exception:
+            logger.exception("Refreshing related articles at exit failed")
+
+    app.extensions["related_thread"] = BackgroundThread("related-articles", run, at_exit=flush_at_exit)
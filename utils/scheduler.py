@@ -0,0 +1,116 @@
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+
+from models import Article, db, utcnow
+from utils.background import BackgroundThread
+from utils.cache import invalidate_articles
+from utils.related import refresh_related_now, related_enabled
+from utils.tags import PUBLISHED, publish_tag_counts
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED = "scheduled"
+
+
+# ISO 8601 from the client, aware values are converted to naive UTC like
+# everything else in the database
+def parse_publish_at(value):
+    publish_at = datetime.fromisoformat(value)
+    if publish_at.tzinfo is not None:
+        publish_at = publish_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return publish_at
+
+
+# Call after setting the requested status. For scheduled and published
+# articles a future publishAt schedules the article, a past one publishes it
+# with that date; drafts stay drafts and ignore it. Articles published
+# without a date, or before a date they were scheduled for, get the current
+# time.
+def apply_publish_at(article, publish_at=None):
+    now = utcnow()
+    if publish_at is not None and article.status in (SCHEDULED, PUBLISHED):
+        article.published_at = publish_at
+        article.status = SCHEDULED if publish_at > now else PUBLISHED
+    elif article.status == PUBLISHED and (article.published_at is None or article.published_at > now):
+        article.published_at = now
+
+
+# Publishes every scheduled article whose time has come. The due queue is
+# read from the (status, published_at, id) index, then each row is claimed
+# with a conditional UPDATE ... WHERE status = 'scheduled': when several
+# workers race for the same batch, only one of them gets rowcount 1 for a
+# given article, so nothing is published (or counted) twice.
+def publish_due_articles(batch_size=100):
+    published = []
+    while True:
+        now = utcnow()
+        due = [
+            article_id for (article_id,) in
+            db.session.query(Article.id)
+            .filter(Article.status == SCHEDULED, Article.published_at <= now)
+            .order_by(Article.published_at, Article.id)
+            .limit(batch_size)
+        ]
+        if not due:
+            break
+
+        claimed = []
+        for article_id in due:
+            result = db.session.execute(
+                update(Article)
+                .where(Article.id == article_id, Article.status == SCHEDULED)
+                .values(status=PUBLISHED, updated_at=now)
+            )
+            if result.rowcount:
+                claimed.append(article_id)
+        tag_slugs = publish_tag_counts(claimed) if claimed else set()
+        author_ids = set(db.session.scalars(
+            select(Article.author_id).where(Article.id.in_(claimed)).distinct()
+        )) if claimed else set()
+        db.session.commit()
+
+        if claimed:
+            invalidate_articles(
+                article_ids=claimed, statuses=[SCHEDULED, PUBLISHED], tag_slugs=tag_slugs, author_ids=author_ids,
+            )
+            # Right away rather than queued, this also runs from the CLI
+            if related_enabled():
+                refresh_related_now(claimed)
+            published.extend(claimed)
+        if len(due) < batch_size:
+            break
+
+    return published
+
+
+# Optional in-process scheduler, enabled with SCHEDULER_ENABLED. Each
+# serving process starts its own thread with its first request, which is
+# safe because of the claims above, but a single `flask publish-scheduled
+# --loop` process is cheaper. CLI commands (migrations included) and
+# seeding never serve a request, so they never publish on the side.
+def init_scheduler(app):
+    if not app.config.get("SCHEDULER_ENABLED"):
+        return
+    interval = app.config.get("SCHEDULER_INTERVAL", 30)
+    batch_size = app.config.get("SCHEDULER_BATCH_SIZE", 100)
+
+    def run():
+        while True:
+            try:
+                with app.app_context():
+                    published = publish_due_articles(batch_size)
+                    if published:
+                        logger.info("Published scheduled articles %s", published)
+            except Exception:
+                logger.exception("Publishing scheduled articles failed")
+            time.sleep(interval)
+
+    thread = BackgroundThread("publish-scheduler", run)
+    app.extensions["scheduler_thread"] = thread
+
+    @app.before_request
+    def start_scheduler():
+        thread.ensure_started()
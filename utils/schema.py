@@ -0,0 +1,179 @@
+import logging
+
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, bindparam, func, inspect, select, text, update,
+)
+
+from models import Article, ArticleTag, RelatedArticle, User, db, utcnow
+from utils.search import create_search_index, rebuild_search_index, search_enabled
+from utils.tags import linked_tag_ids, recount_tags
+
+logger = logging.getLogger(__name__)
+
+# One row per applied migration. Kept out of db.metadata so create_all and
+# drop_all never touch it.
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# (version, name, function), applied in version order by upgrade()
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+
+# Databases from before migrations were tracked were built by create_all on
+# every import. Running it once more creates the tables they miss; columns
+# and indexes added to existing tables since the first release are added
+# by migrations 4 and 5.
+@migration(1, "Baseline schema and full-text index")
+def baseline():
+    db.create_all()
+    create_search_index()
+
+
+# Fill it afterwards with `flask rebuild-related`
+@migration(2, "Related articles index")
+def related_articles():
+    RelatedArticle.__table__.create(db.engine, checkfirst=True)
+
+
+@migration(3, "Author pages index")
+def author_pages_index():
+    for index in Article.__table__.indexes:
+        if index.name == "ix_articles_author_id_status_published_at_id":
+            index.create(db.engine, checkfirst=True)
+
+
+# (table, column, DDL type) added to tables of the first release. Defaults
+# are constants so SQLite's ADD COLUMN accepts them, updated_at is filled
+# below instead.
+ADDED_COLUMNS = (
+    ("articles", "updated_at", "DATETIME"),
+    ("articles", "word_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("articles", "content_hash", "VARCHAR(64)"),
+    ("articles", "tag_ids", "JSON"),
+    ("tags", "article_count", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+
+# Adds the missing columns and fills the ones derived from other tables:
+# tag_ids from article_tag, tag counts, and the search index, which
+# migration 1 created empty. word_count and content_hash need the article
+# bodies parsed, run `flask backfill-content` afterwards for those.
+@migration(4, "Article and tag columns added after the first release")
+def added_columns():
+    inspector = inspect(db.engine)
+    existing = {table: {column["name"] for column in inspector.get_columns(table)} for table in ("articles", "tags")}
+    added = set()
+    for table, column, ddl in ADDED_COLUMNS:
+        if column not in existing[table]:
+            db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            added.add(column)
+
+    articles = Article.__table__
+    db.session.execute(
+        update(articles).where(articles.c.updated_at.is_(None))
+        .values(updated_at=func.coalesce(articles.c.published_at, utcnow()))
+    )
+
+    fill_tag_ids = (
+        update(articles).where(articles.c.id == bindparam("article_id")).values(tag_ids=bindparam("links"))
+    )
+    last_id = 0
+    while True:
+        ids = db.session.scalars(
+            select(articles.c.id).where(articles.c.id > last_id, articles.c.tag_ids.is_(None))
+            .order_by(articles.c.id).limit(1000)
+        ).all()
+        if not ids:
+            break
+        links = linked_tag_ids(ids)
+        db.session.execute(fill_tag_ids, [{"article_id": article_id, "links": links[article_id]} for article_id in ids])
+        last_id = ids[-1]
+
+    recount_tags()
+    if search_enabled():
+        # Commits, the columns above are in by then
+        rebuild_search_index()
+    if "content_hash" in added:
+        logger.warning("Run `flask backfill-content` to fill word_count and content_hash of existing articles")
+
+
+# Indexes added to tables of the first release, all created with checkfirst
+# so databases that already have some of them are fine
+@migration(5, "Indexes added after the first release")
+def added_indexes():
+    names = {
+        "ix_articles_status_published_at_id", "ix_articles_author_id_published_at_id",
+        "ix_articles_status_updated_at", "ix_article_tag_article_id_tag_id", "ix_users_updated_at",
+    }
+    for table in (Article.__table__, ArticleTag.__table__, User.__table__):
+        for index in table.indexes:
+            if index.name in names:
+                index.create(db.session.connection(), checkfirst=True)
+
+
+# Earlier indexes hold the raw HTML bodies
+@migration(6, "Plain-text search index")
+def plain_text_search_index():
+    if search_enabled():
+        rebuild_search_index()
+
+
+# Listing Last-Modified now reads MAX(updated_at) over every article
+@migration(7, "Index on articles.updated_at")
+def articles_updated_at_index():
+    for index in Article.__table__.indexes:
+        if index.name == "ix_articles_updated_at":
+            index.create(db.session.connection(), checkfirst=True)
+
+
+def applied_versions():
+    schema_migrations.create(db.engine, checkfirst=True)
+    return {version for (version,) in db.session.execute(select(schema_migrations.c.version))}
+
+
+def pending_migrations():
+    applied = applied_versions()
+    return [entry for entry in MIGRATIONS if entry[0] not in applied]
+
+
+def _record(version, name):
+    db.session.execute(schema_migrations.insert().values(version=version, name=name, applied_at=utcnow()))
+
+
+# Creates or migrates the schema of the configured database, needs an app
+# context. An empty database gets the current models in one create_all and
+# every migration recorded as applied; an existing one runs the pending
+# migrations in order, committing after each. Returns the versions applied.
+def upgrade():
+    pending = pending_migrations()
+    if not pending:
+        return []
+
+    if len(pending) == len(MIGRATIONS) and not inspect(db.engine).has_table("articles"):
+        db.create_all()
+        create_search_index()
+        for version, name, _ in pending:
+            _record(version, name)
+        db.session.commit()
+        logger.info("Created schema at version %s", pending[-1][0])
+        return [version for version, _, _ in pending]
+
+    for version, name, func in pending:
+        logger.info("Applying migration %s: %s", version, name)
+        func()
+        _record(version, name)
+        db.session.commit()
+    return [version for version, _, _ in pending]
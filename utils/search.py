@@ -0,0 +1,155 @@
+import html
+from collections import namedtuple
+
+from sqlalchemy import text
+
+from models import db
+from utils.content import plain_text
+
+# Standalone FTS5 table keyed by article id (rowid). It is not an external
+# content table because the tags column does not exist on `articles`.
+# Porter stemming so "optimizing" also finds "optimization".
+CREATE_SEARCH_INDEX = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, excerpt, content, tags,
+    tokenize = 'porter unicode61'
+)
+"""
+
+# Column weights for bm25(), a title hit counts far more than a body hit
+RANK = "bm25(articles_fts, 10.0, 4.0, 1.0, 6.0)"
+
+# Bodies are indexed as plain text, so markup is neither searchable nor cut
+# into snippets. Matches are delimited with control characters that cannot
+# occur in that text and turned into <mark> after escaping the rest.
+MATCH_START, MATCH_END = "\x02", "\x03"
+
+SearchHit = namedtuple("SearchHit", "id score snippet")
+
+INSERT_ROW = text(
+    "INSERT INTO articles_fts (rowid, title, excerpt, content, tags) "
+    "VALUES (:id, :title, :excerpt, :content, :tags)"
+)
+# Articles indexed per statement by rebuild_search_index
+REBUILD_BATCH_SIZE = 1000
+
+
+def search_enabled():
+    return db.session.get_bind().dialect.name == "sqlite"
+
+
+def create_search_index():
+    if search_enabled():
+        db.session.execute(text(CREATE_SEARCH_INDEX))
+        db.session.commit()
+
+
+# Keeps the index row of one article in sync, runs inside the caller's
+# transaction so the index can never diverge from a committed write
+def index_article(article, tag_titles):
+    if not search_enabled():
+        return
+    db.session.execute(text("DELETE FROM articles_fts WHERE rowid = :id"), {"id": article.id})
+    db.session.execute(INSERT_ROW, {
+        "id": article.id,
+        "title": article.title,
+        "excerpt": article.excerpt,
+        "content": plain_text(article.content),
+        "tags": " ".join(tag_titles),
+    })
+
+
+# index_article for many new articles at once, as a single executemany.
+# `article_tags` is a list of (article, tag titles) pairs.
+def index_new_articles(article_tags):
+    if not search_enabled() or not article_tags:
+        return
+    db.session.execute(INSERT_ROW, [
+        {
+            "id": article.id,
+            "title": article.title,
+            "excerpt": article.excerpt,
+            "content": plain_text(article.content),
+            "tags": " ".join(tag_titles),
+        }
+        for article, tag_titles in article_tags
+    ])
+
+
+# Rebuilds the whole index from the articles table in one transaction, one
+# executemany per REBUILD_BATCH_SIZE articles since the bodies are reduced
+# to plain text in Python
+def rebuild_search_index():
+    db.session.execute(text("DROP TABLE IF EXISTS articles_fts"))
+    db.session.execute(text(CREATE_SEARCH_INDEX))
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            text("""
+                SELECT a.id, a.title, a.excerpt, a.content,
+                       (SELECT group_concat(t.title, ' ')
+                          FROM article_tag at JOIN tags t ON t.id = at.tag_id
+                         WHERE at.article_id = a.id) AS tags
+                  FROM articles a
+                 WHERE a.id > :last_id
+                 ORDER BY a.id
+                 LIMIT :limit
+            """),
+            {"last_id": last_id, "limit": REBUILD_BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        db.session.execute(INSERT_ROW, [
+            {
+                "id": row.id,
+                "title": row.title,
+                "excerpt": row.excerpt,
+                "content": plain_text(row.content),
+                "tags": row.tags or "",
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+    db.session.execute(text("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')"))
+    db.session.commit()
+    return db.session.execute(text("SELECT count(*) FROM articles_fts")).scalar()
+
+
+# Turns free text into an FTS5 query: every word must match, quoted so
+# user input can never be parsed as FTS syntax, and the last word is a
+# prefix so results show up while typing
+def build_match_query(q):
+    terms = ['"' + term.replace('"', '""') + '"' for term in q.split()]
+    if not terms:
+        return None
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _snippet_html(snippet):
+    escaped = html.escape(snippet or "", quote=False)
+    return escaped.replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+
+# Returns [SearchHit(id, score, snippet)] best match first, snippets are
+# escaped HTML with the matches in <mark>
+def search_articles(q, status, limit, offset):
+    match = build_match_query(q)
+    if match is None:
+        return []
+    rows = db.session.execute(
+        text(f"""
+            SELECT a.id, {RANK} AS score,
+                   snippet(articles_fts, -1, :match_start, :match_end, '...', 16) AS snippet
+              FROM articles_fts
+              JOIN articles a ON a.id = articles_fts.rowid
+             WHERE articles_fts MATCH :match AND a.status = :status
+             ORDER BY score
+             LIMIT :limit OFFSET :offset
+        """),
+        {
+            "match": match, "status": status, "limit": limit, "offset": offset,
+            "match_start": MATCH_START, "match_end": MATCH_END,
+        },
+    )
+    return [SearchHit(row.id, row.score, _snippet_html(row.snippet)) for row in rows]
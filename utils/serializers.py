@@ -0,0 +1,122 @@
+import json
+from datetime import date, datetime
+from operator import attrgetter
+
+from flask.json.provider import DefaultJSONProvider
+
+from utils.metrics import timed_serialization
+from utils.tags import tags_for
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Builds a serializer from a field list once at import time. Each field is
+# either an attribute name or an (output key, attribute name or callable)
+# pair, so per object we only run a dict comprehension over ready getters.
+def compile_schema(*fields):
+    getters = []
+    for field in fields:
+        name, source = (field, field) if isinstance(field, str) else field
+        getters.append((name, attrgetter(source) if isinstance(source, str) else source))
+    getters = tuple(getters)
+
+    def serialize(obj):
+        return {name: getter(obj) for name, getter in getters}
+    return serialize
+
+
+serialize_tag = compile_schema("id", "title", "slug")
+serialize_tag_with_count = compile_schema("id", "title", "slug", "article_count")
+
+serialize_author = compile_schema("id", "name", "email", "avatar")
+
+serialize_user = compile_schema("id", "email", "name", "avatar", "created_at")
+
+
+def _article_tags(article):
+    return tags_for(article.tag_ids)
+
+
+def _article_author(article):
+    return serialize_author(article.author)
+
+
+_ARTICLE_CARD_FIELDS = (
+    "id", "title", "slug", "excerpt", "featured_image_url", "read_time_minutes", "word_count",
+    "status",
+)
+
+# Public listing card, never touches `content`
+serialize_article_summary = compile_schema(
+    *_ARTICLE_CARD_FIELDS,
+    ("author", _article_author),
+    "published_at",
+    ("tags", _article_tags),
+)
+
+# Public detail view
+serialize_article_detail = compile_schema(
+    *_ARTICLE_CARD_FIELDS,
+    "content",
+    ("author", _article_author),
+    "published_at",
+    ("tags", _article_tags),
+)
+
+# Author's own view of an article, used by the write endpoints and
+# /users/articles. Tags are passed in separately by the callers that have them.
+serialize_own_article = compile_schema(
+    *_ARTICLE_CARD_FIELDS, "content", "author_id", "published_at",
+)
+serialize_own_article_summary = compile_schema(
+    *_ARTICLE_CARD_FIELDS, "author_id", "published_at",
+)
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+# JSON provider for the whole app. Uses orjson when it is installed, the
+# stdlib otherwise. Either way datetimes come out as ISO 8601 instead of
+# Flask's HTTP date format, and keys are not sorted.
+class FastJSONProvider(DefaultJSONProvider):
+    sort_keys = False
+    use_orjson = orjson is not None
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj):
+        if self.use_orjson:
+            return orjson.dumps(obj, default=_default)
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed_serialization():
+            body = self.dumps_bytes(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class StdlibJSONProvider(FastJSONProvider):
+    use_orjson = False
+
+
+# JSON_BACKEND: "auto" (orjson if installed), "orjson" or "json"
+def init_json(app):
+    backend = app.config.get("JSON_BACKEND", "auto")
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND is orjson but orjson is not installed")
+    provider = StdlibJSONProvider if backend == "json" else FastJSONProvider
+    app.json = provider(app)
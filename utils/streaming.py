@@ -0,0 +1,52 @@
+from flask import Response, current_app, stream_with_context
+
+# Rows fetched from the database per round trip while streaming
+STREAM_BATCH_SIZE = 500
+# Bytes buffered before a chunk is sent to the client
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _chunked(parts):
+    buffer = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= STREAM_CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _json_array(rows, serialize, dumps):
+    yield b"["
+    first = True
+    for row in rows:
+        yield dumps(serialize(row)) if first else b"," + dumps(serialize(row))
+        first = False
+    yield b"]"
+
+
+def _json_lines(rows, serialize, dumps):
+    for row in rows:
+        yield dumps(serialize(row)) + b"\n"
+
+
+# Streams `query` as one JSON array. Rows are pulled from a server side
+# cursor in batches (yield_per), serialized one by one and flushed in
+# ~64KB chunks, so memory stays flat however many rows match.
+def stream_json_array(query, serialize):
+    dumps = current_app.json.dumps_bytes
+    rows = query.yield_per(STREAM_BATCH_SIZE)
+    body = _chunked(_json_array(rows, serialize, dumps))
+    return Response(stream_with_context(body), mimetype="application/json")
+
+
+# Same as stream_json_array but one JSON document per line (NDJSON), which
+# clients can process row by row and feed back into POST /articles/bulk
+def stream_ndjson(query, serialize):
+    dumps = current_app.json.dumps_bytes
+    rows = query.yield_per(STREAM_BATCH_SIZE)
+    body = _chunked(_json_lines(rows, serialize, dumps))
+    return Response(stream_with_context(body), mimetype="application/x-ndjson")
@@ -0,0 +1,240 @@
+from collections import Counter
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import Article, ArticleTag, Tag, db
+from utils.cache import get_tag_cache
+
+PUBLISHED = "published"
+
+
+# INSERT that silently skips rows hitting the unique tag slug, so two
+# requests creating the same new tag at once both end up with one row
+def _insert_ignore_tags():
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(Tag.__table__).on_conflict_do_nothing(index_elements=["slug"])
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        return mysql_insert(Tag.__table__).prefix_with("IGNORE")
+    raise NotImplementedError(f"Tag upsert is not implemented for {dialect}")
+
+
+# Maps tag names to Tag rows in one IN query, creating the missing ones
+# with a single bulk insert. Tags are matched on their slug so "Web Dev"
+# and "web dev" are the same tag. Order of `names` is kept, duplicates are
+# dropped.
+#
+# slugify pulls in the unidecode tables, so it is only imported once tags
+# are actually written.
+def resolve_tags(names):
+    from slugify import slugify
+
+    wanted = {}
+    for name in names:
+        slug = slugify(name)
+        if slug and slug not in wanted:
+            wanted[slug] = name.strip()
+    if not wanted:
+        return []
+
+    tags = {tag.slug: tag for tag in Tag.query.filter(Tag.slug.in_(wanted)).all()}
+    missing = [{"title": wanted[slug], "slug": slug} for slug in wanted if slug not in tags]
+    if missing:
+        db.session.execute(_insert_ignore_tags(), missing)
+        # Re-read instead of trusting our insert, a concurrent request may
+        # have created some of them first
+        created = Tag.query.filter(Tag.slug.in_([row["slug"] for row in missing])).all()
+        tags.update({tag.slug: tag for tag in created})
+
+    return [tags[slug] for slug in wanted]
+
+
+# Points an existing article at exactly the given tags, only writing the
+# links that were actually added or removed. Returns the resolved tags and
+# the slugs of the tags whose article set or count changed. New articles
+# go through link_new_articles instead.
+def set_article_tags(article, names, was_published=False):
+    tags = resolve_tags(names)
+    new_tags = {tag.id: tag.slug for tag in tags}
+
+    rows = db.session.execute(
+        select(ArticleTag.tag_id, Tag.slug)
+        .join(Tag, ArticleTag.tag_id == Tag.id)
+        .where(ArticleTag.article_id == article.id)
+    )
+    old_tags = dict(rows.all())
+
+    removed = old_tags.keys() - new_tags.keys()
+    added = new_tags.keys() - old_tags.keys()
+    # Same set in another order is not a change, the stored order is kept
+    if removed or added:
+        article.tag_ids = list(new_tags)
+    if removed:
+        db.session.execute(
+            delete(ArticleTag)
+            .where(ArticleTag.article_id == article.id, ArticleTag.tag_id.in_(removed))
+        )
+    if added:
+        db.session.execute(
+            insert(ArticleTag),
+            [{"article_id": article.id, "tag_id": tag.id} for tag in tags if tag.id in added],
+        )
+
+    is_published = article.status == PUBLISHED
+    _update_tag_counts(
+        old_tags.keys() if was_published else (),
+        new_tags.keys() if is_published else (),
+    )
+
+    changed = {old_tags[tag_id] for tag_id in removed} | {new_tags[tag_id] for tag_id in added}
+    if was_published != is_published:
+        changed |= set(old_tags.values()) | set(new_tags.values())
+    return tags, changed
+
+
+# For writes that change the status but leave the tags alone. Returns the
+# slugs of the tags whose count changed.
+def update_article_tag_counts(article_id, was_published, is_published):
+    if was_published == is_published:
+        return set()
+    rows = db.session.execute(
+        select(ArticleTag.tag_id, Tag.slug)
+        .join(Tag, ArticleTag.tag_id == Tag.id)
+        .where(ArticleTag.article_id == article_id)
+    )
+    tags = dict(rows.all())
+    _update_tag_counts(tags if was_published else (), tags if is_published else ())
+    return set(tags.values())
+
+
+# Links freshly inserted articles to their already resolved tags with one
+# executemany, and bumps the counts of the published ones in one pass.
+# The articles were inserted with their tag_ids already set.
+# `article_tags` is a list of (article, tags) pairs. Returns the slugs of
+# the tags whose article set changed.
+def link_new_articles(article_tags):
+    links, published_tag_ids, changed = [], [], set()
+    for article, tags in article_tags:
+        for tag in tags:
+            links.append({"article_id": article.id, "tag_id": tag.id})
+            changed.add(tag.slug)
+            if article.status == PUBLISHED:
+                published_tag_ids.append(tag.id)
+    if links:
+        db.session.execute(insert(ArticleTag), links)
+    _update_tag_counts((), published_tag_ids)
+    return changed
+
+
+# Scheduled articles going live in bulk, one query for all of their tags.
+# Returns the slugs of the tags whose count changed.
+def publish_tag_counts(article_ids):
+    rows = db.session.execute(
+        select(ArticleTag.tag_id, Tag.slug)
+        .join(Tag, ArticleTag.tag_id == Tag.id)
+        .where(ArticleTag.article_id.in_(article_ids))
+    ).all()
+    _update_tag_counts((), [tag_id for tag_id, _ in rows])
+    return {slug for _, slug in rows}
+
+
+# Tag.article_count only counts published articles, so an article leaves
+# the counts of its old tags if it was published and joins the counts of
+# its new tags if it is now. One UPDATE per distinct delta.
+def _update_tag_counts(left_tag_ids, joined_tag_ids):
+    deltas = Counter()
+    for tag_id in left_tag_ids:
+        deltas[tag_id] -= 1
+    for tag_id in joined_tag_ids:
+        deltas[tag_id] += 1
+
+    by_delta = {}
+    for tag_id, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(tag_id)
+    for delta, tag_ids in by_delta.items():
+        db.session.execute(
+            update(Tag)
+            .where(Tag.id.in_(tag_ids))
+            .values(article_count=Tag.article_count + delta)
+        )
+
+
+# Recomputes every Tag.article_count from scratch, for seeding and repairs
+def recount_tags():
+    published_links = (
+        select(func.count(ArticleTag.id))
+        .join(Article, ArticleTag.article_id == Article.id)
+        .where(ArticleTag.tag_id == Tag.id, Article.status == PUBLISHED)
+        .scalar_subquery()
+    )
+    db.session.execute(update(Tag).values(article_count=published_links))
+
+
+# Restricts an article query to articles carrying all (or any) of the tags
+def filter_by_tags(query, tag_slugs, match_all=True):
+    article_ids = (
+        select(ArticleTag.article_id)
+        .join(Tag, ArticleTag.tag_id == Tag.id)
+        .where(Tag.slug.in_(tag_slugs))
+    )
+    if match_all and len(tag_slugs) > 1:
+        article_ids = (
+            article_ids.group_by(ArticleTag.article_id)
+            .having(func.count(ArticleTag.tag_id) == len(tag_slugs))
+        )
+    return query.filter(Article.id.in_(article_ids))
+
+
+# Loads the tags the cache is missing in one IN query, so a page of
+# articles costs at most one tag query and usually none
+def prime_tag_cache(tag_ids):
+    missing = _uncached_tag_ids(tag_ids)
+    if missing:
+        _cache_tags(db.session.execute(_tags_query(missing)))
+
+
+async def prime_tag_cache_async(session, tag_ids):
+    missing = _uncached_tag_ids(tag_ids)
+    if missing:
+        _cache_tags(await session.execute(_tags_query(missing)))
+
+
+def _uncached_tag_ids(tag_ids):
+    cache = get_tag_cache()
+    return {tag_id for tag_id in tag_ids if cache.get(tag_id) is None}
+
+
+def _tags_query(tag_ids):
+    return select(Tag.id, Tag.title, Tag.slug).where(Tag.id.in_(tag_ids))
+
+
+def _cache_tags(rows):
+    cache = get_tag_cache()
+    for tag_id, title, slug in rows:
+        cache.set(tag_id, {"id": tag_id, "title": title, "slug": slug})
+
+
+# Article.tag_ids rendered as [{id, title, slug}], in stored order
+def tags_for(tag_ids):
+    if not tag_ids:
+        return []
+    prime_tag_cache(tag_ids)
+    cache = get_tag_cache()
+    return [tag for tag in map(cache.get, tag_ids) if tag is not None]
+
+
+# Article.tag_ids from the article_tag rows, in link order, for the
+# articles in `article_ids`
+def linked_tag_ids(article_ids):
+    links = {article_id: [] for article_id in article_ids}
+    rows = db.session.execute(
+        select(ArticleTag.article_id, ArticleTag.tag_id)
+        .where(ArticleTag.article_id.in_(article_ids))
+        .order_by(ArticleTag.id)
+    )
+    for article_id, tag_id in rows:
+        links[article_id].append(tag_id)
+    return links
@@ -0,0 +1,193 @@
+import heapq
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import Article, ArticleViewCount, db, utcnow
+from utils.background import BackgroundThread
+from utils.tags import PUBLISHED
+
+logger = logging.getLogger(__name__)
+
+# ?window= values of /articles/popular. Each score is a view count with an
+# exponential decay whose half-life is a quarter of the window, so recent
+# views weigh more than old ones.
+POPULAR_WINDOWS = {"24h": timedelta(hours=24), "7d": timedelta(days=7), "30d": timedelta(days=30)}
+# Articles kept per window in the precomputed ranking
+POPULAR_SIZE = 100
+
+
+def _hour(now):
+    return now.replace(minute=0, second=0, microsecond=0)
+
+
+# UPSERT adding to the hourly bucket, so flushes from any number of
+# processes add up instead of overwriting each other
+def _upsert_views(rows):
+    table = ArticleViewCount.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["article_id", "bucket"],
+            set_={"views": table.c.views + stmt.excluded.views},
+        )
+    elif dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(views=table.c.views + stmt.inserted.views)
+    else:
+        raise NotImplementedError(f"View count upsert is not implemented for {dialect}")
+    db.session.execute(stmt, rows)
+
+
+# Per-process write-behind counters. Recording a view is a dict increment
+# under a lock; the counts reach the database in one executemany per
+# flush, from the background thread, every VIEW_FLUSH_INTERVAL seconds or
+# as soon as VIEW_FLUSH_THRESHOLD views are pending.
+class ViewCounter:
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._pending = Counter()  # (article_id, hour) -> views
+        self._total = 0
+        self.flush_requested = threading.Event()
+
+    def record(self, article_id):
+        with self._lock:
+            self._pending[(article_id, _hour(utcnow()))] += 1
+            self._total += 1
+            if self._total >= self.threshold:
+                self.flush_requested.set()
+
+    # Caller needs an app context. Counts are put back if the write fails,
+    # so a locked database delays them instead of losing them.
+    def flush(self):
+        with self._lock:
+            pending, self._pending, self._total = self._pending, Counter(), 0
+        self.flush_requested.clear()
+        if not pending:
+            return 0
+        try:
+            _upsert_views([
+                {"article_id": article_id, "bucket": bucket, "views": views}
+                for (article_id, bucket), views in pending.items()
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                self._pending.update(pending)
+                self._total += sum(pending.values())
+            raise
+        return sum(pending.values())
+
+
+# Precomputed top POPULAR_SIZE published articles per window, replaced as
+# a whole on every refresh so readers never see a half-built ranking
+class PopularRanking:
+    def __init__(self):
+        self.rankings = {}  # window -> [(article_id, score)]
+        self.generation = 0
+        self.refreshed = threading.Event()
+
+    def refresh(self):
+        now = utcnow()
+        rankings = {}
+        for name, window in POPULAR_WINDOWS.items():
+            half_life = window.total_seconds() / 4
+            scores = Counter()
+            rows = db.session.execute(
+                select(ArticleViewCount.article_id, ArticleViewCount.bucket, ArticleViewCount.views)
+                .join(Article, ArticleViewCount.article_id == Article.id)
+                .where(ArticleViewCount.bucket >= now - window, Article.status == PUBLISHED)
+            )
+            for article_id, bucket, views in rows:
+                age = (now - bucket).total_seconds()
+                scores[article_id] += views * 0.5 ** (age / half_life)
+            rankings[name] = heapq.nlargest(POPULAR_SIZE, scores.items(), key=lambda item: item[1])
+        db.session.rollback()
+
+        self.rankings = rankings
+        self.generation += 1
+        self.refreshed.set()
+
+    def top(self, window, limit):
+        return self.rankings.get(window, [])[:limit]
+
+
+def get_view_counter():
+    return current_app.extensions["view_counter"]
+
+
+def get_popular_ranking():
+    current_app.extensions["view_thread"].ensure_started()
+    return current_app.extensions["popular_ranking"]
+
+
+def record_view(article_id):
+    counter = current_app.extensions.get("view_counter")
+    if counter is not None:
+        counter.record(article_id)
+        current_app.extensions["view_thread"].ensure_started()
+
+
+# Drops hourly buckets no window can reach any more, run from cron with
+# `flask prune-views` rather than by every worker. Returns the rows deleted.
+def prune_view_counts():
+    oldest = utcnow() - max(POPULAR_WINDOWS.values()) - timedelta(hours=1)
+    deleted = db.session.execute(delete(ArticleViewCount).where(ArticleViewCount.bucket < oldest)).rowcount
+    db.session.commit()
+    return deleted
+
+
+# VIEW_COUNTS_ENABLED: record views and serve /articles/popular
+# VIEW_FLUSH_INTERVAL / VIEW_FLUSH_THRESHOLD: when pending views are written
+# POPULAR_REFRESH_INTERVAL: seconds between ranking rebuilds
+#
+# One background thread per serving process does the flushing and the
+# ranking, started by its first view or /articles/popular request. Pending
+# views are flushed at exit too; a killed worker loses at most one interval
+# of views.
+def init_views(app):
+    app.config.setdefault("VIEW_COUNTS_ENABLED", True)
+    app.config.setdefault("VIEW_FLUSH_INTERVAL", 5)
+    app.config.setdefault("VIEW_FLUSH_THRESHOLD", 1000)
+    app.config.setdefault("POPULAR_REFRESH_INTERVAL", 60)
+    if not app.config["VIEW_COUNTS_ENABLED"]:
+        return
+
+    counter = ViewCounter(app.config["VIEW_FLUSH_THRESHOLD"])
+    ranking = PopularRanking()
+    app.extensions["view_counter"] = counter
+    app.extensions["popular_ranking"] = ranking
+    flush_interval = app.config["VIEW_FLUSH_INTERVAL"]
+    refresh_interval = app.config["POPULAR_REFRESH_INTERVAL"]
+
+    def run():
+        next_refresh = 0
+        while True:
+            counter.flush_requested.wait(flush_interval)
+            try:
+                with app.app_context():
+                    counter.flush()
+                    if time.monotonic() >= next_refresh:
+                        ranking.refresh()
+                        next_refresh = time.monotonic() + refresh_interval
+            except Exception:
+                logger.exception("Flushing view counts failed")
+
+    def flush_at_exit():
+        try:
+            with app.app_context():
+                counter.flush()
+        except Exception:
+            logger.exception("Flushing view counts at exit failed")
+
+    app.extensions["view_thread"] = BackgroundThread("view-counter", run, at_exit=flush_at_exit)